@@ -1,6 +1,12 @@
-from pydantic_settings import BaseSettings
+from pathlib import Path
+from pydantic_settings import BaseSettings, PydanticBaseSettingsSource
 
-class BaseSettings(BaseSettings):
+# .env / .apikey는 프로젝트 루트 기준 (pydantic-settings는 상대 경로를 CWD 기준으로 찾으므로
+# 다른 디렉터리에서 봇/GUI를 실행해도 API 키와 STRATEGY_TYPE이 로드되도록 절대 경로로 고정)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ENV_FILES = (PROJECT_ROOT / ".env", PROJECT_ROOT / ".apikey")
+
+class AppBaseSettings(BaseSettings):
     """공통 설정: API 인증, 기본 트레이딩 설정"""
     
     # API 인증
@@ -18,6 +24,18 @@ class BaseSettings(BaseSettings):
     STRATEGY_TYPE: str = "OBI"     # "OBI" or "VWAP"
     
     model_config = {
-        "env_file": [".env", ".apikey"],  # .env와 .apikey 파일 모두 로드
+        "env_file": ENV_FILES,  # .env와 .apikey 파일 모두 로드
         "env_file_encoding": "utf-8",
-    }
\ No newline at end of file
+    }
+
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls: type[BaseSettings],
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ) -> tuple[PydanticBaseSettingsSource, ...]:
+        """secrets 디렉터리는 사용하지 않으므로 init / env / dotenv 소스만 평가"""
+        return init_settings, env_settings, dotenv_settings
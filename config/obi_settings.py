@@ -1,6 +1,6 @@
-from .base_settings import BaseSettings
+from .base_settings import AppBaseSettings
 
-class OBISettings(BaseSettings):
+class OBISettings(AppBaseSettings):
     """OBI (Order Book Imbalance) 전략 설정"""
     
     # OBI 전략 파라미터
@@ -1,27 +1,42 @@
-import os
-from dotenv import load_dotenv
-from .base_settings import BaseSettings
+import logging
+from functools import cache
+from pydantic_settings import BaseSettings
+from .base_settings import AppBaseSettings, ENV_FILES
 from .obi_settings import OBISettings  
 from .vwap_settings import VWAPSettings
+from utils.logger import log
 
-# .env와 .apikey 파일 로드
-load_dotenv()  # .env 로드
-load_dotenv(".apikey")  # .apikey 로드
 
+class _StrategySelector(BaseSettings):
+    """STRATEGY_TYPE만 읽어 설정 클래스를 고르기 위한 최소 설정 (.env/.apikey는 pydantic-settings가 직접 파싱)"""
+    STRATEGY_TYPE: str = "OBI"
+    
+    model_config = {
+        "env_file": ENV_FILES,
+        "env_file_encoding": "utf-8",
+        "extra": "ignore",
+    }
+
+# 전략 타입 → 설정 클래스 (전략별 설정은 모두 AppBaseSettings를 상속)
+SETTINGS_BY_STRATEGY: dict[str, type[AppBaseSettings]] = {
+    "OBI": OBISettings,
+    "VWAP": VWAPSettings,
+}
+
+@cache
 def get_settings():
-    """전략 타입에 따라 적절한 설정을 반환"""
-    # .env 파일에서 전략 타입 확인 (기본값: OBI)
-    strategy_type = os.getenv("STRATEGY_TYPE", "OBI").upper()
+    """전략 타입에 따라 적절한 설정을 반환 (최초 호출 시 한 번만 생성, 테스트에서는 get_settings.cache_clear() 사용)"""
+    # 환경변수 / .env 파일에서 전략 타입 확인 (기본값: OBI)
+    strategy_type = _StrategySelector().STRATEGY_TYPE.upper()
     
-    if strategy_type == "VWAP":
-        return VWAPSettings()
-    elif strategy_type == "OBI":
-        return OBISettings()
-    else:
+    settings_cls = SETTINGS_BY_STRATEGY.get(strategy_type)
+    if settings_cls is None:
         raise ValueError(f"Unknown strategy type: {strategy_type}. Use 'OBI' or 'VWAP'")
+    return settings_cls()
 
 # 전역 설정 인스턴스
 settings = get_settings()
 
 # 디버그용 출력
-print(f"Loaded {type(settings).__name__} for strategy: {settings.STRATEGY_TYPE}")
+if log.isEnabledFor(logging.DEBUG):
+    log.debug("Loaded %s for strategy: %s", type(settings).__name__, settings.STRATEGY_TYPE)
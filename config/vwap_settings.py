@@ -1,6 +1,6 @@
-from .base_settings import BaseSettings
+from .base_settings import AppBaseSettings
 
-class VWAPSettings(BaseSettings):
+class VWAPSettings(AppBaseSettings):
     """VWAP Mean Reversion 전략 설정"""
     
     # VWAP 계산 파라미터
@@ -1,19 +1,83 @@
 import asyncio
+import random
+import sqlite3
+from dataclasses import dataclass, field
+from queue import Queue, Empty, Full
+import numpy as np
 from binance import AsyncClient, BinanceSocketManager
-from typing import Optional
+from typing import Callable, Optional
 import time
 import threading
 
 from config.settings import settings
 from utils.logger import log
 
+try:
+    from gui.data_broker import data_broker
+except ImportError:
+    # GUI 모듈이 없는 경우 GUI 업데이트 생략
+    data_broker = None
+
+
+@dataclass(slots=True)
+class ConnectionStats:
+    """스트림 연결 상태 (수신 시각은 NTP 보정에 영향받지 않는 monotonic 기준)"""
+    reconnect_count: int = 0
+    last_reconnect_time: Optional[float] = None  # wall clock (GUI 표시용)
+    total_disconnections: int = 0
+    dropped_messages: int = 0  # 처리 큐 초과로 버린 메시지 수
+    stream_start_time: float = field(default_factory=time.monotonic)
+    last_depth_update: Optional[float] = None
+    last_book_ticker_update: Optional[float] = None
+    last_trade_update: Optional[float] = None
+    last_kline_update: Optional[float] = None
+    
+    def to_dict(self, now: float) -> dict:
+        """GUI 전달용 dict (각 스트림의 마지막 수신 이후 경과 시간 포함)"""
+        return {
+            'uptime_minutes': (now - self.stream_start_time) / 60,
+            'total_disconnections': self.total_disconnections,
+            'reconnect_count': self.reconnect_count,
+            'dropped_messages': self.dropped_messages,
+            'last_reconnect_time': self.last_reconnect_time,
+            'depth_lag': now - self.last_depth_update if self.last_depth_update else None,
+            'book_ticker_lag': now - self.last_book_ticker_update if self.last_book_ticker_update else None,
+            'trade_lag': now - self.last_trade_update if self.last_trade_update else None,
+            'kline_lag': now - self.last_kline_update if self.last_kline_update else None
+        }
+
 
 class FuturesDepthStream:
     """Original depth stream for OBI strategy - maintained for backward compatibility"""
     
+    # partial book depth 스트림이 지원하는 호가 레벨
+    STREAM_DEPTH_LEVELS = (5, 10, 20)
+    
     def __init__(self, symbol: str):
         self.symbol = symbol.lower()
-        self.depth = None
+        # depth dict는 한 번만 만들고 'b'/'a' 슬롯만 교체 (이벤트 루프 단일 스레드라 두 슬롯은 함께 갱신됨)
+        self.depth = {'b': None, 'a': None}
+        # OBI 계산에 필요한 상위 N 호가만 유지하고, N 이상인 최소 레벨만 구독
+        self.depth_level = settings.DEPTH_LEVEL
+        self.stream_depth = next(
+            (d for d in self.STREAM_DEPTH_LEVELS if d >= self.depth_level),
+            self.STREAM_DEPTH_LEVELS[-1]
+        )
+
+    def _on_depth(self, msg: dict):
+        """
+        partial depth 메시지 → self.depth 갱신
+        futures_depth_socket은 combined stream 주소로 연결되므로 {"stream": ..., "data": {"b": [...], "a": [...]}}
+        형식으로 수신됨 (오류 메시지 등 data가 없는 메시지는 무시)
+        문자열 [price, qty] 리스트는 수신 시 한 번만 (N, 2) float64 배열로 변환하고 OBI에 쓰는 상위 N 호가만 유지
+        """
+        data = msg.get('data')
+        if data is None or 'b' not in data or 'a' not in data:
+            return
+        n = self.depth_level
+        depth = self.depth
+        depth['b'] = np.asarray(data['b'][:n], dtype=np.float64).reshape(-1, 2)
+        depth['a'] = np.asarray(data['a'][:n], dtype=np.float64).reshape(-1, 2)
 
     async def run(self):
         try:
@@ -26,19 +90,14 @@ class FuturesDepthStream:
             client = await AsyncClient.create(**kwargs)
             
             try:
+                # BinanceSocketManager는 orjson이 설치되어 있으면 프레임 디코딩에 orjson을 사용
                 bm = BinanceSocketManager(client)
                 # Use futures depth stream
-                async with bm.futures_depth_socket(self.symbol) as stream:
+                on_depth = self._on_depth
+                async with bm.futures_depth_socket(self.symbol, depth=str(self.stream_depth)) as stream:
+                    recv = stream.recv
                     while True:
-                        msg = await stream.recv()
-                        # Transform message to match original format expected by strategy
-                        # BinanceSocketManager returns {'bids': [...], 'asks': [...], ...}
-                        # but strategy expects {'b': [...], 'a': [...], ...}
-                        if 'bids' in msg and 'asks' in msg:
-                            self.depth = {
-                                'b': msg['bids'],
-                                'a': msg['asks']
-                            }
+                        on_depth(await recv())
             finally:
                 await client.close_connection()
         except asyncio.CancelledError:
@@ -53,36 +112,46 @@ class EnhancedFuturesStream:
     """
     Enhanced futures stream for VWAP strategy supporting multiple data streams:
     - Depth stream for order book data
+    - Book ticker stream for real-time best bid/ask
     - Trade stream for VWAP calculation
     - Kline stream for ADX calculation
+    
+    Depth + book ticker share one combined "public" socket and trade + kline share
+    one combined "market" socket; messages are dispatched by payload event type.
     """
     
+    GUI_UPDATE_INTERVAL = 0.5  # GUI 데이터 갱신 주기 (초)
+    MESSAGE_QUEUE_SIZE = 1024  # 스트림별 처리 대기 메시지 상한 (초과 시 가장 오래된 메시지 폐기)
+    
     def __init__(self, symbol: str, strategy=None):
         self.symbol = symbol.lower()
         self.strategy = strategy  # VWAP strategy instance
+        self._strategy_is_vwap = hasattr(strategy, 'vwap_calc') if strategy else False
         
-        # Data streams
-        self.depth = None
+        # Data streams (depth dict는 한 번만 만들고 'b'/'a' 슬롯만 교체)
+        self.depth = {'b': None, 'a': None}
         self.current_price = 0.0
-        
-        # Stream tasks
-        self.depth_task = None
-        self.trade_task = None
-        self.kline_task = None
+        self.best_bid = 0.0  # @bookTicker 최우선 매수호가
+        self.best_ask = 0.0  # @bookTicker 최우선 매도호가
         
         # Connection monitoring
-        self.connection_stats = {
-            'reconnect_count': 0,
-            'last_reconnect_time': None,
-            'total_disconnections': 0,
-            'stream_start_time': time.time(),
-            'last_depth_update': None,
-            'last_trade_update': None,
-            'last_kline_update': None
-        }
+        self.connection_stats = ConnectionStats()
+        
+        # GUI 업데이트 시각 (거래 빈도와 무관하게 GUI_UPDATE_INTERVAL마다 갱신)
+        self._last_gui_update = 0.0
+        
+        # GUI 데이터 브로커 메서드와 전략 타입은 한 번만 조회해 바인딩
+        self._gui_update_state = data_broker.update_state if data_broker else None
+        self._gui_update_connection_stats = data_broker.update_connection_stats if data_broker else None
+        self._strategy_type = settings.STRATEGY_TYPE
+        
+        # VWAP 히스토리 저장 (단일 writer 태스크가 큐를 비우며 일괄 저장)
+        self.db_path = "storage/orders.db"
+        self._vwap_history_queue: Queue = Queue(maxsize=1000)
+        self._vwap_history_thread: Optional[threading.Thread] = None
+        self._last_vwap_save_time = 0.0
         
         # Health monitoring
-        self._health_monitor_task = None
         self._monitoring_active = False
     
     async def run(self):
@@ -105,312 +174,425 @@ class EnhancedFuturesStream:
                 
                 # Start health monitoring
                 self._monitoring_active = True
-                self._health_monitor_task = asyncio.create_task(self._monitor_connection_health(), name="HealthMonitor")
-                
-                # Create concurrent stream tasks
-                self.depth_task = asyncio.create_task(self._run_depth_stream(bm), name="DepthStream")
-                self.trade_task = asyncio.create_task(self._run_trade_stream(bm), name="TradeStream")
-                self.kline_task = asyncio.create_task(self._run_kline_stream(bm), name="KlineStream")
                 
-                log.info(f"[EnhancedFuturesStream] All streams started for {self.symbol}")
-                
-                # Wait for all streams
-                await asyncio.gather(
-                    self.depth_task,
-                    self.trade_task,
-                    self.kline_task,
-                    self._health_monitor_task
+                # VWAP 히스토리 writer 스레드 (DB I/O가 이벤트 루프를 점유하지 않도록 분리)
+                self._vwap_history_thread = threading.Thread(
+                    target=self._vwap_history_writer, name="VWAPHistoryWriter", daemon=True
                 )
+                self._vwap_history_thread.start()
+                
+                # 스트림 태스크를 TaskGroup으로 묶어 하나가 실패하거나 취소되면 나머지도 함께 취소
+                async with asyncio.TaskGroup() as tg:
+                    tg.create_task(self._monitor_connection_health(), name="HealthMonitor")
+                    # Binance USD-M은 URL 경로(public/market)별로 스트림을 라우팅하므로 경로당 하나의 combined 소켓 사용
+                    tg.create_task(self._run_multiplex_stream(
+                        bm, "PublicStream", "public",
+                        [f"{self.symbol}@depth10", f"{self.symbol}@bookTicker"],
+                        {'depthUpdate': self._make_depth_handler(), 'bookTicker': self._make_book_ticker_handler()}
+                    ), name="PublicStream")
+                    on_trade, flush_trades = self._make_trade_handler()
+                    tg.create_task(self._run_multiplex_stream(
+                        bm, "MarketStream", "market",
+                        [f"{self.symbol}@aggTrade", f"{self.symbol}@kline_1m"],
+                        {'aggTrade': on_trade, 'kline': self._make_kline_handler()},
+                        on_batch_end=flush_trades
+                    ), name="MarketStream")
+                    
+                    log.info(f"[EnhancedFuturesStream] All streams started for {self.symbol}")
             finally:
                 self._monitoring_active = False
+                await self._stop_vwap_history_writer()
                 await client.close_connection()
                 
         except asyncio.CancelledError:
             log.info("[EnhancedFuturesStream] Stream cancelled")
-            self._monitoring_active = False
-            if self.depth_task:
-                self.depth_task.cancel()
-            if self.trade_task:
-                self.trade_task.cancel()
-            if self.kline_task:
-                self.kline_task.cancel()
-            if self._health_monitor_task:
-                self._health_monitor_task.cancel()
             raise
         except Exception as e:
             log.exception("[EnhancedFuturesStream] Stream error")
-            self._monitoring_active = False
             raise e
     
-    async def _run_depth_stream(self, bm: BinanceSocketManager):
-        """Handle order book depth updates (maintains compatibility with OBI strategy)"""
+    async def _retry_stream(self, name: str, description: str, open_stream: Callable, on_msg: Callable[[dict], None],
+                            on_batch_end: Optional[Callable[[], None]] = None,
+                            max_retries: int = 5, base_delay: float = 1, max_delay: float = 60):
+        """
+        공통 스트림 수신 루프: 연결 실패 시 full jitter 지수 백오프로 재연결
+        (delay = uniform(0, min(max_delay, base_delay * 2^(n-1))) → 여러 스트림/봇이 동시에 재연결하지 않도록 분산)
+        
+        수신(_read_stream 태스크)과 처리를 분리하고, 처리 루프는 큐에 쌓인 메시지를 await 없이 모두 처리한 뒤
+        on_batch_end를 한 번 호출
+        """
         retry_count = 0
-        max_retries = 5
-        base_delay = 1
         
         while retry_count < max_retries:
             try:
-                log.info(f"[DepthStream] Starting depth stream (attempt {retry_count + 1})")
-                async with bm.futures_depth_socket(self.symbol) as stream:
+                log.info(f"[{name}] Starting {description} (attempt {retry_count + 1})")
+                async with open_stream() as stream:
                     retry_count = 0  # 성공적으로 연결되면 리트라이 카운트 리셋
                     
-                    while True:
-                        msg = await stream.recv()
-                        if 'bids' in msg and 'asks' in msg:
-                            self.depth = {
-                                'b': msg['bids'],
-                                'a': msg['asks']
-                            }
-                            # Update current price from best bid/ask
-                            if len(msg['bids']) > 0 and len(msg['asks']) > 0:
-                                bid = float(msg['bids'][0][0])
-                                ask = float(msg['asks'][0][0])
-                                self.current_price = (bid + ask) / 2
-                                
-                            # 연결 상태 업데이트
-                            self.connection_stats['last_depth_update'] = time.time()
-                            
+                    queue: asyncio.Queue = asyncio.Queue(maxsize=self.MESSAGE_QUEUE_SIZE)
+                    reader = asyncio.create_task(self._read_stream(stream, queue), name=f"{name}Reader")
+                    
+                    def handle(msg):
+                        # 수신 오류는 큐를 통해 전달되어 여기서 재발생 → 재연결
+                        if isinstance(msg, Exception):
+                            raise msg
+                        on_msg(msg)
+                    
+                    get = queue.get
+                    get_nowait = queue.get_nowait
+                    empty = queue.empty
+                    try:
+                        while True:
+                            try:
+                                handle(await get())
+                                while not empty():
+                                    handle(get_nowait())
+                            finally:
+                                if on_batch_end is not None:
+                                    on_batch_end()
+                    finally:
+                        # 소켓을 닫거나 재연결하기 전에 수신 태스크가 완전히 끝나도록 대기 (미회수 예외 경고 방지)
+                        reader.cancel()
+                        await asyncio.gather(reader, return_exceptions=True)
+                        
             except asyncio.CancelledError:
-                log.info("[DepthStream] Depth stream cancelled")
+                log.info(f"[{name}] {description.capitalize()} cancelled")
                 raise
             except Exception as e:
                 retry_count += 1
-                self.connection_stats['total_disconnections'] += 1
-                self.connection_stats['last_reconnect_time'] = time.time()
+                self.connection_stats.total_disconnections += 1
+                self.connection_stats.last_reconnect_time = time.time()
                 
                 if retry_count >= max_retries:
-                    log.error(f"[DepthStream] Max retries ({max_retries}) reached. Giving up.")
+                    log.error(f"[{name}] Max retries ({max_retries}) reached. Giving up.")
                     raise
                 
-                delay = base_delay * (2 ** (retry_count - 1))  # 지수 백오프
-                log.warning(f"[DepthStream] Connection error (attempt {retry_count}/{max_retries}): {e}")
-                log.info(f"[DepthStream] Retrying in {delay} seconds...")
+                delay = random.uniform(0, min(max_delay, base_delay * (2 ** (retry_count - 1))))  # full jitter 백오프
+                log.warning(f"[{name}] Connection error (attempt {retry_count}/{max_retries}): {e}")
+                log.info(f"[{name}] Retrying in {delay:.2f} seconds...")
                 await asyncio.sleep(delay)
     
-    async def _run_trade_stream(self, bm: BinanceSocketManager):
-        """Handle individual trades for VWAP calculation"""
-        retry_count = 0
-        max_retries = 5
-        base_delay = 1
+    async def _read_stream(self, stream, queue: asyncio.Queue):
+        """
+        수신 전용 루프: 라이브러리 수신 큐(가득 차면 연결 종료)를 즉시 비워 처리 지연과 분리
+        처리 큐가 가득 차면 가장 오래된 메시지를 버려 최신 데이터를 우선 (load shedding)
+        """
+        # ReconnectingWebsocket은 async 이터레이터를 제공하지 않으므로 메서드를 한 번만 바인딩
+        recv = stream.recv
+        full = queue.full
+        get_nowait = queue.get_nowait
+        put_nowait = queue.put_nowait
+        stats = self.connection_stats
         
-        while retry_count < max_retries:
+        while True:
             try:
-                log.info(f"[TradeStream] Starting trade stream (attempt {retry_count + 1})")
-                async with bm.aggtrade_futures_socket(self.symbol) as stream:
-                    retry_count = 0  # 성공적으로 연결되면 리트라이 카운트 리셋
-                    
-                    while True:
-                        msg = await stream.recv()
-                        price = float(msg['data']['p'])
-                        quantity = float(msg['data']['q'])
-                        
-                        # Update current price
-                        self.current_price = price
-                        
-                        # Update strategy if available
-                        if self.strategy:
-                            self.strategy.update_trade(price, quantity)
-                            
-                            # Check for session reset
-                            self.strategy.check_session_reset()
-                        
-                        # Update GUI data every few updates (to avoid overwhelming)
-                        if hasattr(self, '_gui_update_counter'):
-                            self._gui_update_counter += 1
-                        else:
-                            self._gui_update_counter = 1
-                        
-                        if self._gui_update_counter % 10 == 0:  # Update every 10 trades
-                            self.update_gui_data()
-                        
-                        # 연결 상태 업데이트
-                        self.connection_stats['last_trade_update'] = time.time()
-                        
-            except asyncio.CancelledError:
-                log.info("[TradeStream] Trade stream cancelled")
-                raise
+                msg = await recv()
             except Exception as e:
-                retry_count += 1
-                self.connection_stats['total_disconnections'] += 1
-                self.connection_stats['last_reconnect_time'] = time.time()
-                
-                if retry_count >= max_retries:
-                    log.error(f"[TradeStream] Max retries ({max_retries}) reached. Giving up.")
-                    raise
-                
-                delay = base_delay * (2 ** (retry_count - 1))  # 지수 백오프
-                log.warning(f"[TradeStream] Connection error (attempt {retry_count}/{max_retries}): {e}")
-                log.info(f"[TradeStream] Retrying in {delay} seconds...")
-                await asyncio.sleep(delay)
+                msg = e
+            
+            if full():
+                get_nowait()
+                stats.dropped_messages += 1
+            put_nowait(msg)
+            
+            if isinstance(msg, Exception):
+                return
     
-    async def _run_kline_stream(self, bm: BinanceSocketManager):
-        """Handle kline data for ADX calculation"""
-        retry_count = 0
-        max_retries = 5
-        base_delay = 1
+    async def _run_multiplex_stream(self, bm: BinanceSocketManager, name: str, category: str,
+                                    streams: list[str], handlers: dict[str, Callable[[dict], None]],
+                                    on_batch_end: Optional[Callable[[], None]] = None):
+        """
+        여러 스트림을 하나의 combined stream 소켓으로 수신하고 이벤트 타입('e')별 핸들러로 분배
+        (combined stream 메시지 형식: {"stream": "<streamName>", "data": <rawPayload>})
+        """
+        def on_msg(msg: dict):
+            data = msg.get('data')
+            if data is None:
+                # 소켓 오류는 {"e": "error", ...} 형태로 큐에 들어오므로 재연결을 위해 예외로 전환
+                if msg.get('e') == 'error':
+                    raise ConnectionError(f"{msg.get('type')}: {msg.get('m')}")
+                return
+            handler = handlers.get(data.get('e'))
+            if handler is not None:
+                handler(data)
         
-        while retry_count < max_retries:
+        await self._retry_stream(
+            name, f"{category} stream ({', '.join(streams)})",
+            lambda: bm.futures_multiplex_socket(streams, category=category),
+            on_msg,
+            on_batch_end
+        )
+    
+    def _make_depth_handler(self) -> Callable[[dict], None]:
+        """Handle order book depth updates (maintains compatibility with OBI strategy)"""
+        depth = self.depth
+        stats = self.connection_stats
+        monotonic = time.monotonic
+        last_top = (None, None)
+        mid = 0.0
+        
+        def on_depth(data: dict):
+            nonlocal last_top, mid
+            bids = data.get('b')
+            asks = data.get('a')
+            if bids is not None and asks is not None:
+                depth['b'] = bids
+                depth['a'] = asks
+                # Update current price from best bid/ask (book ticker 수신 전까지만 사용하는 fallback)
+                # 최우선 호가 문자열이 이전 메시지와 같으면 float 변환/재계산 생략
+                if bids and asks and not self.best_bid:
+                    top = (bids[0][0], asks[0][0])
+                    if top != last_top:
+                        last_top = top
+                        mid = (float(top[0]) + float(top[1])) * 0.5
+                    self.current_price = mid
+                    
+                # 연결 상태 업데이트
+                stats.last_depth_update = monotonic()
+        
+        return on_depth
+    
+    def _make_book_ticker_handler(self) -> Callable[[dict], None]:
+        """Handle @bookTicker updates (top-of-book changes, no 100ms depth batching)"""
+        stats = self.connection_stats
+        monotonic = time.monotonic
+        last_top = (None, None)
+        mid = 0.0
+        
+        def on_book_ticker(data: dict):
+            nonlocal last_top, mid
+            # bookTicker는 최우선 호가 수량만 바뀌어도 전송되므로 가격이 같으면 float 변환/재계산 생략
+            top = (data['b'], data['a'])
+            if top != last_top:
+                last_top = top
+                bid = float(top[0])
+                ask = float(top[1])
+                self.best_bid = bid
+                self.best_ask = ask
+                mid = (bid + ask) * 0.5
+            self.current_price = mid
+            
+            # 연결 상태 업데이트
+            stats.last_book_ticker_update = monotonic()
+        
+        return on_book_ticker
+    
+    def _make_trade_handler(self) -> tuple[Callable[[dict], None], Callable[[], None]]:
+        """
+        Handle individual trades for VWAP calculation
+        
+        on_trade는 거래를 버퍼에 모으기만 하고, flush가 수신 큐를 비운 뒤 묶음 단위로 전략에 반영
+        """
+        stats = self.connection_stats
+        monotonic = time.monotonic
+        gui_update_interval = self.GUI_UPDATE_INTERVAL
+        prices: list[float] = []
+        quantities: list[float] = []
+        
+        # 메시지마다 속성 조회를 하지 않도록 전략 메서드를 미리 바인딩
+        strategy = self.strategy
+        if strategy:
+            update_trades_batch = strategy.update_trades_batch
+            check_session_reset = strategy.check_session_reset
+        
+        def on_trade(data: dict):
+            prices.append(float(data['p']))
+            quantities.append(float(data['q']))
+        
+        def flush_trades():
+            if not prices:
+                return
+            
+            # Update current price
+            self.current_price = prices[-1]
+            
+            # Update strategy if available
             try:
-                log.info(f"[KlineStream] Starting kline stream (attempt {retry_count + 1})")
-                async with bm.kline_futures_socket(self.symbol, interval='1m') as stream:
-                    retry_count = 0  # 성공적으로 연결되면 리트라이 카운트 리셋
+                if strategy:
+                    update_trades_batch(prices, quantities)
                     
-                    while True:
-                        msg = await stream.recv()
-                        kline = msg['k']
-                        
-                        # Only process closed klines
-                        if kline['x']:  # Kline is closed
-                            high = float(kline['h'])
-                            low = float(kline['l'])
-                            close = float(kline['c'])
-                            
-                            log.debug(f"[KlineStream] Kline closed - H:{high}, L:{low}, C:{close}")
-                            
-                            # Update strategy if available
-                            if self.strategy:
-                                old_adx = getattr(self.strategy, 'current_adx', None)
-                                self.strategy.update_kline(high, low, close)
-                                new_adx = getattr(self.strategy, 'current_adx', None)
-                                log.debug(f"[KlineStream] ADX updated from {old_adx} to {new_adx}")
-                        
-                        # 연결 상태 업데이트
-                        self.connection_stats['last_kline_update'] = time.time()
-                        
-            except asyncio.CancelledError:
-                log.info("[KlineStream] Kline stream cancelled")
-                raise
-            except Exception as e:
-                retry_count += 1
-                self.connection_stats['total_disconnections'] += 1
-                self.connection_stats['last_reconnect_time'] = time.time()
+                    # Check for session reset
+                    check_session_reset()
+            finally:
+                prices.clear()
+                quantities.clear()
+            
+            now = monotonic()
+            
+            # Update GUI data periodically (to avoid overwhelming during trade bursts)
+            if now - self._last_gui_update >= gui_update_interval:
+                self._last_gui_update = now
+                self.update_gui_data()
+            
+            # 연결 상태 업데이트
+            stats.last_trade_update = now
+        
+        return on_trade, flush_trades
+    
+    def _make_kline_handler(self) -> Callable[[dict], None]:
+        """Handle kline data for ADX calculation"""
+        stats = self.connection_stats
+        monotonic = time.monotonic
+        
+        def on_kline(data: dict):
+            kline = data['k']
+            
+            # Only process closed klines
+            if kline['x']:  # Kline is closed
+                high = float(kline['h'])
+                low = float(kline['l'])
+                close = float(kline['c'])
                 
-                if retry_count >= max_retries:
-                    log.error(f"[KlineStream] Max retries ({max_retries}) reached. Giving up.")
-                    raise
+                log.debug("[KlineStream] Kline closed - H:%s, L:%s, C:%s", high, low, close)
                 
-                delay = base_delay * (2 ** (retry_count - 1))  # 지수 백오프
-                log.warning(f"[KlineStream] Connection error (attempt {retry_count}/{max_retries}): {e}")
-                log.info(f"[KlineStream] Retrying in {delay} seconds...")
-                await asyncio.sleep(delay)
-    
+                # Update strategy if available
+                if self.strategy:
+                    old_adx = getattr(self.strategy, 'current_adx', None)
+                    self.strategy.update_kline(high, low, close)
+                    new_adx = getattr(self.strategy, 'current_adx', None)
+                    log.debug("[KlineStream] ADX updated from %s to %s", old_adx, new_adx)
+            
+            # 연결 상태 업데이트
+            stats.last_kline_update = monotonic()
+        
+        return on_kline
     def get_indicator_data(self) -> dict:
         """Get current values of all indicators"""
         if self.strategy:
+            # 전략은 호출마다 새 dict를 반환하므로 복사 없이 current_price만 덮어씀
             indicator_data = self.strategy.get_indicator_data()
             indicator_data['current_price'] = self.current_price
             return indicator_data
         else:
             return {
                 'current_price': self.current_price,
-                'depth_available': self.depth is not None
+                'depth_available': self.depth['b'] is not None
             }
     
     def update_gui_data(self):
         """GUI 데이터 브로커 업데이트 및 VWAP 히스토리 저장"""
+        # GUI 데이터 브로커가 있는 경우에만 업데이트
+        update_state = self._gui_update_state
+        if update_state is None:
+            return
+        
         try:
-            # GUI 데이터 브로커가 있는 경우에만 업데이트
-            try:
-                from gui.data_broker import data_broker
-                
-                # 현재 가격 업데이트
-                data_broker.update_price(self.current_price)
-                
-                # 전략별 지표 업데이트
-                if self.strategy:
-                    indicator_data = self.strategy.get_indicator_data()
+            # 전략별 지표 업데이트
+            if self.strategy:
+                # VWAP 전략 지표
+                if self._strategy_is_vwap:
+                    snap = self.strategy.get_indicator_snapshot()
+                    vwap = snap.vwap
+                    adx = snap.adx  # None을 허용
                     
-                    # VWAP 전략 지표
-                    if hasattr(self.strategy, 'vwap_calc'):
-                        vwap = indicator_data.get('vwap', 0)
-                        upper_band = indicator_data.get('upper_band', 0)
-                        lower_band = indicator_data.get('lower_band', 0)
-                        adx = indicator_data.get('adx')  # None을 허용
-                        log.debug(f"[GUI Update] Retrieved ADX from indicator_data: {adx} (type: {type(adx)})")
-                        
-                        data_broker.update_indicators(
-                            vwap=vwap,
-                            upper_band=upper_band,
-                            lower_band=lower_band,
-                            adx=adx if adx is not None else 0
-                        )
-                        
-                        # 변동성 중단 상태
-                        is_halted = indicator_data.get('is_halted', False)
-                        data_broker.set_halt_status(is_halted)
-                        
-                        # 연결 상태 통계 업데이트
-                        if hasattr(self, 'get_connection_stats'):
-                            connection_stats = self.get_connection_stats()
-                            data_broker.update_connection_stats(connection_stats)
-                        
-                        # VWAP 히스토리 DB 저장 (10초마다)
-                        if vwap > 0:
-                            self._save_vwap_history_async(vwap, upper_band, lower_band, adx)
+                    # 연결 상태 통계 업데이트
+                    self._gui_update_connection_stats(self.get_connection_stats())
+                    
+                    # 가격/지표/중단 상태/전략 타입을 한 번의 상태 갱신(파일 저장 1회)으로 반영
+                    update_state(
+                        current_price=self.current_price,
+                        vwap=vwap,
+                        upper_band=snap.upper_band,
+                        lower_band=snap.lower_band,
+                        adx=adx if adx is not None else 0,
+                        is_halted=snap.is_halted,
+                        strategy_type=self._strategy_type
+                    )
                     
-                    # 전략 타입 업데이트
-                    from config.settings import settings
-                    data_broker.update_state(strategy_type=settings.STRATEGY_TYPE)
-            except ImportError:
-                # GUI 모듈이 없는 경우 무시
-                pass
+                    # VWAP 히스토리 DB 저장 (10초마다)
+                    if vwap > 0:
+                        self._save_vwap_history_async(vwap, snap.upper_band, snap.lower_band, adx)
+                else:
+                    update_state(current_price=self.current_price, strategy_type=self._strategy_type)
+            else:
+                update_state(current_price=self.current_price)
         except Exception as e:
-            log.debug(f"GUI update failed: {e}")
+            log.debug("GUI update failed: %s", e)
     
     def _save_vwap_history_async(self, vwap: float, upper_band: float, lower_band: float, adx: float):
-        """VWAP 히스토리를 비동기로 저장 (GUI 스레드를 차단하지 않음)"""
-        if not hasattr(self, '_last_vwap_save_time'):
-            self._last_vwap_save_time = 0
-        
-        import time
-        current_time = time.time()
+        """VWAP 히스토리를 writer 큐에 적재 (DB I/O는 _vwap_history_writer가 일괄 처리)"""
+        current_time = time.monotonic()
         
         # 10초마다만 저장 (과도한 저장 방지)
         if current_time - self._last_vwap_save_time >= 10:
             self._last_vwap_save_time = current_time
             
-            # PositionManager 인스턴스를 통해 저장
+            # 현재 윈도우 내 거래 수 계산
+            trade_count = 0
+            if self._strategy_is_vwap:
+                trade_count = self.strategy.vwap_calc.get_trade_count()
+            
+            # ADX 값이 None이면 NULL로 저장
             try:
-                # main.py에서 전역 position_manager에 접근
-                import asyncio
-                from config.settings import settings
-                
-                # 비동기 태스크로 실행하여 GUI 스레드 차단 방지
-                asyncio.create_task(self._save_vwap_to_db(
-                    settings.SYMBOL, vwap, upper_band, lower_band, self.current_price, adx
-                ), name="VWAPDataSaver")
-                log.debug(f"[VWAPHistory] Saving VWAP data: vwap={vwap:.2f}, adx={adx}")
-            except Exception as e:
-                log.error(f"Failed to save VWAP history: {e}")
+                self._vwap_history_queue.put_nowait(
+                    (settings.SYMBOL, vwap, upper_band, lower_band, self.current_price, adx, trade_count)
+                )
+                log.debug("[VWAPHistory] Queued VWAP data: vwap=%.2f, adx=%s", vwap, adx)
+            except Full:
+                log.warning("[VWAPHistory] Writer queue full, dropping VWAP history row")
     
-    async def _save_vwap_to_db(self, symbol: str, vwap: float, upper_band: float, 
-                              lower_band: float, current_price: float, adx: float):
-        """VWAP 데이터를 DB에 저장"""
+    def _vwap_history_writer(self):
+        """VWAP 히스토리 전용 writer 스레드: sqlite3 연결(WAL) 하나를 소유하고 큐에 쌓인 행을 모아서 한 번에 커밋"""
+        history_queue = self._vwap_history_queue
         try:
-            import aiosqlite
-            
-            # ADX 값이 None이면 NULL로 저장, 값이 있으면 그대로 저장
-            adx_value = adx if adx is not None else None
-            log.debug(f"[VWAPHistory] Saving ADX to DB: adx={adx}, adx_value={adx_value}")
+            conn = sqlite3.connect(self.db_path)
+        except Exception as e:
+            log.error("[VWAPHistory] Writer stopped: %s", e)
+            return
+        
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
             
-            async with aiosqlite.connect("storage/orders.db") as db:
-                # 현재 윈도우 내 거래 수 계산
-                trade_count = 0
-                if hasattr(self.strategy, 'vwap_calc'):
-                    trade_count = self.strategy.vwap_calc.get_trade_count()
+            while True:
+                rows = [history_queue.get()]
+                try:
+                    while True:
+                        rows.append(history_queue.get_nowait())
+                except Empty:
+                    pass
                 
-                await db.execute(
-                    """
-                    INSERT INTO vwap_history 
-                    (symbol, vwap, upper_band, lower_band, current_price, adx, volume_window_trades)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (symbol, vwap, upper_band, lower_band, current_price, adx_value, trade_count)
-                )
-                await db.commit()
-                log.debug(f"[VWAPHistory] Saved to DB: vwap={vwap:.2f}, bands=[{lower_band:.2f}-{upper_band:.2f}], adx={adx_value}")
+                # None은 종료 신호 (종료 전 남은 행은 저장)
+                stop = None in rows
+                rows = [row for row in rows if row is not None]
+                
+                if rows:
+                    try:
+                        conn.executemany(
+                            """
+                            INSERT INTO vwap_history 
+                            (symbol, vwap, upper_band, lower_band, current_price, adx, volume_window_trades)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)
+                            """,
+                            rows
+                        )
+                        conn.commit()
+                        log.debug("[VWAPHistory] Saved %d row(s) to DB", len(rows))
+                    except Exception as e:
+                        log.error("Error saving VWAP history: %s", e)
+                
+                if stop:
+                    return
         except Exception as e:
-            log.error(f"Error saving VWAP history: {e}")
+            log.error("[VWAPHistory] Writer stopped: %s", e)
+        finally:
+            conn.close()
+    
+    async def _stop_vwap_history_writer(self):
+        """writer 스레드에 종료 신호를 보내고 남은 행이 저장될 때까지 잠시 대기 (이벤트 루프는 막지 않음)"""
+        thread = self._vwap_history_thread
+        if thread is None:
+            return
+        self._vwap_history_thread = None
+        try:
+            self._vwap_history_queue.put_nowait(None)
+        except Full:
+            # 큐가 가득 차 있으면 writer가 비울 때까지 (루프 밖 스레드에서) 기다렸다가 종료 신호 전달
+            try:
+                await asyncio.to_thread(self._vwap_history_queue.put, None, timeout=5)
+            except Full:
+                log.warning("[VWAPHistory] Writer queue still full, stop signal not delivered")
+        await asyncio.to_thread(thread.join, 5)
     
     async def _monitor_connection_health(self):
         """연결 상태를 모니터링하고 통계를 로깅"""
@@ -418,32 +600,27 @@ class EnhancedFuturesStream:
             try:
                 await asyncio.sleep(30)  # 30초마다 체크
                 
-                current_time = time.time()
-                uptime = current_time - self.connection_stats['stream_start_time']
+                stats = self.connection_stats
+                current_time = time.monotonic()
+                uptime = current_time - stats.stream_start_time
                 
                 # 각 스트림의 마지막 업데이트 시간 체크
-                depth_lag = None
-                trade_lag = None
-                kline_lag = None
-                
-                if self.connection_stats['last_depth_update']:
-                    depth_lag = current_time - self.connection_stats['last_depth_update']
-                    
-                if self.connection_stats['last_trade_update']:
-                    trade_lag = current_time - self.connection_stats['last_trade_update']
-                    
-                if self.connection_stats['last_kline_update']:
-                    kline_lag = current_time - self.connection_stats['last_kline_update']
+                last_depth_update = stats.last_depth_update
+                last_trade_update = stats.last_trade_update
+                last_kline_update = stats.last_kline_update
+                depth_lag = current_time - last_depth_update if last_depth_update else None
+                trade_lag = current_time - last_trade_update if last_trade_update else None
+                kline_lag = current_time - last_kline_update if last_kline_update else None
                 
                 # 상태 로깅
-                log.info(f"[ConnectionHealth] Uptime: {uptime/60:.1f}min, Disconnections: {self.connection_stats['total_disconnections']}")
+                log.info(f"[ConnectionHealth] Uptime: {uptime/60:.1f}min, Disconnections: {stats.total_disconnections}, Dropped: {stats.dropped_messages}")
                 
                 if depth_lag is not None:
-                    log.debug(f"[ConnectionHealth] Depth lag: {depth_lag:.1f}s")
+                    log.debug("[ConnectionHealth] Depth lag: %.1fs", depth_lag)
                 if trade_lag is not None:
-                    log.debug(f"[ConnectionHealth] Trade lag: {trade_lag:.1f}s")
+                    log.debug("[ConnectionHealth] Trade lag: %.1fs", trade_lag)
                 if kline_lag is not None:
-                    log.debug(f"[ConnectionHealth] Kline lag: {kline_lag:.1f}s")
+                    log.debug("[ConnectionHealth] Kline lag: %.1fs", kline_lag)
                 
                 # 연결 문제 감지 (60초 이상 업데이트 없음)
                 if (depth_lag and depth_lag > 60) or (trade_lag and trade_lag > 60):
@@ -456,15 +633,4 @@ class EnhancedFuturesStream:
     
     def get_connection_stats(self) -> dict:
         """연결 통계 정보 반환"""
-        current_time = time.time()
-        uptime = current_time - self.connection_stats['stream_start_time']
-        
-        return {
-            'uptime_minutes': uptime / 60,
-            'total_disconnections': self.connection_stats['total_disconnections'],
-            'reconnect_count': self.connection_stats['reconnect_count'],
-            'last_reconnect_time': self.connection_stats['last_reconnect_time'],
-            'depth_lag': current_time - self.connection_stats['last_depth_update'] if self.connection_stats['last_depth_update'] else None,
-            'trade_lag': current_time - self.connection_stats['last_trade_update'] if self.connection_stats['last_trade_update'] else None,
-            'kline_lag': current_time - self.connection_stats['last_kline_update'] if self.connection_stats['last_kline_update'] else None
-        }
\ No newline at end of file
+        return self.connection_stats.to_dict(time.monotonic())
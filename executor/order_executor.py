@@ -1,68 +1,219 @@
-from decimal import Decimal, ROUND_DOWN
+import asyncio
+from contextvars import ContextVar
+from dataclasses import dataclass
+from decimal import Decimal
+from functools import lru_cache
 from utils.logger import log
 from config.settings import settings
-from binance import AsyncClient
+from binance import AsyncClient, BinanceSocketManager
 
-# 전역 AsyncClient 주입 및 Optional 선언
-client: AsyncClient | None = None
+__all__ = [
+    'inject_client',
+    'load_symbol_filters',
+    'place_limit_maker',
+    'place_limit_maker_batch',
+    'cancel_order',
+    'get_open_orders',
+    'get_order',
+    'get_symbol_ticker',
+    'place_market_order',
+    'futures_user_socket',
+    'futures_book_ticker_socket'
+]
+
+# AsyncClient 주입 (ContextVar: 주입 이후 생성된 태스크는 같은 클라이언트를 상속하고,
+# 다른 컨텍스트에서 다른 클라이언트를 주입해도 서로 격리됨 - 멀티 계정/테스트용)
+_client: ContextVar[AsyncClient | None] = ContextVar("binance_client", default=None)
 
 # DRY_RUN 지원
 
 def inject_client(c: AsyncClient):
-    """AsyncClient 인스턴스 주입"""
-    global client
-    client = c
+    """AsyncClient 인스턴스 주입 (현재 컨텍스트 및 이후 생성되는 태스크에 적용)"""
+    _client.set(c)
+
+
+def _require_client() -> AsyncClient:
+    """주입된 AsyncClient 반환 (python -O에서도 동작하도록 assert 대신 예외)"""
+    c = _client.get()
+    if c is None:
+        raise RuntimeError("AsyncClient not injected")
+    return c
+
+
+@dataclass(frozen=True, slots=True)
+class SymbolFilters:
+    """
+    exchangeInfo PRICE_FILTER.tickSize / LOT_SIZE.stepSize를 정수 스케일로 변환한 값
+    (tick=0.10 → price_decimals=1, price_tick=1 / step=0.001 → qty_decimals=3, qty_step=1)
+    """
+    price_decimals: int
+    price_tick: int
+    qty_decimals: int
+    qty_step: int
+
+
+# load_symbol_filters() 전 기본값: 가격 소수 2자리, 수량 소수 6자리
+_filters = SymbolFilters(price_decimals=2, price_tick=1, qty_decimals=6, qty_step=1)
+
+# batchOrders 요청당 최대 주문 수 (Binance futures 제한)
+_MAX_BATCH_ORDERS = 5
+
+# 주문마다 바뀌지 않는 LIMIT_MAKER 주문 항목 (단건/batchOrders 공통, side별 템플릿을 복사해 symbol/quantity/price만 채움)
+# symbol은 다른 주문 경로와 같이 호출 시점의 settings에서 읽음 (import 시점 값 고정 방지)
+_LIMIT_MAKER_TEMPLATES = {
+    side: {
+        "side": side,
+        "type": "LIMIT",            # 지정가
+        "timeInForce": "GTX",       # POST-ONLY
+        "newOrderRespType": "ACK",
+    }
+    for side in ("BUY", "SELL")
+}
+# 단건 주문 요청의 recvWindow (batchOrders에서는 주문 항목이 아닌 요청 파라미터라 서버 기본값 5000ms 사용)
+_RECV_WINDOW = 5000
+
+
+def _scaled(size: str) -> tuple[int, int]:
+    """tickSize/stepSize 문자열 → (소수 자릿수, 해당 자릿수 기준 정수 크기)"""
+    d = Decimal(size).normalize()
+    decimals = max(-d.as_tuple().exponent, 0)
+    return decimals, int(d.scaleb(decimals))
+
+
+async def load_symbol_filters(symbol: str = None):
+    """
+    exchangeInfo에서 심볼의 가격/수량 단위를 한 번 조회해 캐시 (inject_client 이후 시작 시 1회 호출)
+    조회 실패 시 기본값(가격 2자리, 수량 6자리) 유지
+    """
+    global _filters
+    symbol = symbol or settings.SYMBOL
+    try:
+        info = await _require_client().futures_exchange_info()
+        sym = next(s for s in info["symbols"] if s["symbol"] == symbol)
+        by_type = {f["filterType"]: f for f in sym["filters"]}
+        price_decimals, price_tick = _scaled(by_type["PRICE_FILTER"]["tickSize"])
+        qty_decimals, qty_step = _scaled(by_type["LOT_SIZE"]["stepSize"])
+    except Exception as e:
+        log.warning("[Executor] Failed to load %s filters, using defaults: %s", symbol, e)
+        return
+
+    _filters = SymbolFilters(price_decimals, price_tick, qty_decimals, qty_step)
+    # 단위가 바뀌었으므로 이전 기준으로 캐시된 문자열 폐기
+    _qty.cache_clear()
+    _fmt_units.cache_clear()
+    log.info("[Executor] %s filters loaded: %s", symbol, _filters)
 
 
+@lru_cache(maxsize=1024)
+def _fmt_units(units: int, decimals: int) -> str:
+    """10^-decimals 단위 정수를 주문용 문자열로 변환 (같은 값 재호가 시 캐시 재사용)"""
+    if decimals == 0:
+        return str(units)
+    whole, frac = divmod(units, 10 ** decimals)
+    return f"{whole}.{frac:0{decimals}d}"
+
+
+@lru_cache(maxsize=1024)
 def _qty(usdt: float, price: float) -> str:
-    """거래소 LOT_SIZE 규칙 대응: 소수 6자리로 내림"""
-    qty = Decimal(usdt / price).quantize(Decimal("0.000001"), ROUND_DOWN)
-    return format(qty, "f")
+    """거래소 LOT_SIZE 규칙 대응: stepSize 배수로 내림 (Decimal 대신 정수 스케일링)"""
+    f = _filters
+    units = int(usdt / price * 10 ** f.qty_decimals)
+    return _fmt_units(units - units % f.qty_step, f.qty_decimals)
+
+
+def _price(price: float) -> str:
+    """거래소 PRICE_FILTER 규칙 대응: tickSize 배수로 반올림한 가격 문자열"""
+    f = _filters
+    return _fmt_units(round(price * 10 ** f.price_decimals / f.price_tick) * f.price_tick, f.price_decimals)
+
+
+def _limit_maker_params(side: str, price: float) -> dict:
+    """LIMIT_MAKER 주문 항목 (place_limit_maker / place_limit_maker_batch가 같은 템플릿으로 생성)"""
+    params = _LIMIT_MAKER_TEMPLATES[side].copy()
+    params["symbol"] = settings.SYMBOL
+    params["quantity"] = _qty(settings.SIZE_QUOTE, price)
+    params["price"] = _price(price)
+    return params
 
 async def place_limit_maker(side: str, price: float):
     """
     futures post-only 지정가 주문 (WebSocket API 사용)
     """
-    qty_str = _qty(settings.SIZE_QUOTE, price)
+    params = _limit_maker_params(side, price)
 
     if settings.DRY_RUN:
-        log.info(f"[DRY_RUN] {side} LIMIT_MAKER simulated: {settings.SYMBOL} @ {price}, qty={qty_str}")
+        log.info("[DRY_RUN] %s LIMIT_MAKER simulated: %s @ %s, qty=%s",
+                 side, params["symbol"], price, params["quantity"])
         return {
             "orderId": -1,
-            "symbol": settings.SYMBOL,
+            "symbol": params["symbol"],
             "side": side,
             "type": "LIMIT",
-            "price": f"{price:.2f}",
-            "origQty": qty_str,
+            "price": params["price"],
+            "origQty": params["quantity"],
             "status": "NEW"
         }
 
-    assert client, "AsyncClient가 주입되지 않았습니다."
+    c = _require_client()
     # WebSocket API를 사용한 futures 주문
-    order = await client.ws_futures_create_order(
-        symbol=settings.SYMBOL,
-        side=side,
-        type="LIMIT",           # 지정가
-        timeInForce="GTX",      # POST-ONLY
-        quantity=qty_str,
-        price=f"{price:.2f}",
-        newOrderRespType="ACK",
-        recvWindow=5000,
-    )
+    order = await c.ws_futures_create_order(**params, recvWindow=_RECV_WINDOW)
 
-    log.info(f"[Executor] {side} LIMIT_MAKER {order['orderId']} @ {price}, qty={qty_str}")
+    log.info("[Executor] %s LIMIT_MAKER %s @ %s, qty=%s", side, order["orderId"], price, params["quantity"])
     return order
 
+async def place_limit_maker_batch(orders: list[tuple[str, float]]) -> list[dict]:
+    """
+    여러 post-only 지정가 주문을 batchOrders로 묶어 전송 (요청당 최대 5건, 묶음 요청들은 동시에 전송)
+    orders: (side, price) 목록. 결과는 주문 순서대로 반환되며 실패한 주문은 {"code", "msg"} 항목
+    """
+    batch = [_limit_maker_params(side, price) for side, price in orders]
+
+    if settings.DRY_RUN:
+        log.info("[DRY_RUN] %d LIMIT_MAKER batch simulated: %s", len(batch), settings.SYMBOL)
+        return [
+            {
+                "orderId": -1,
+                "symbol": o["symbol"],
+                "side": o["side"],
+                "type": "LIMIT",
+                "price": o["price"],
+                "origQty": o["quantity"],
+                "status": "NEW"
+            }
+            for o in batch
+        ]
+
+    c = _require_client()
+    # 5건 단위 요청들은 서로 독립적이므로 동시에 전송해 왕복 지연을 겹침 (gather는 요청 순서대로 결과 반환)
+    # 한 요청이 실패해도 나머지 요청의 주문은 이미 거래소에 올라가 있으므로 결과를 버리지 않음
+    slices = [batch[i:i + _MAX_BATCH_ORDERS] for i in range(0, len(batch), _MAX_BATCH_ORDERS)]
+    chunks = await asyncio.gather(
+        *(c.futures_place_batch_order(batchOrders=chunk) for chunk in slices),
+        return_exceptions=True
+    )
+    results = []
+    for chunk, resp in zip(slices, chunks):
+        if isinstance(resp, Exception):
+            # 요청 단위 실패(HTTP 오류, rate limit 등)는 해당 묶음의 주문마다 {"code", "msg"} 항목으로 펼침
+            log.error("[Executor] LIMIT_MAKER batch request of %d failed: %s", len(chunk), resp)
+            error = {"code": getattr(resp, "code", -1), "msg": getattr(resp, "message", None) or str(resp)}
+            results.extend(error.copy() for _ in chunk)
+        else:
+            results.extend(resp)
+
+    log.info("[Executor] LIMIT_MAKER batch of %d sent: %s", len(batch), [r.get("orderId") for r in results])
+    return results
+
 async def cancel_order(order_id: int):
     """주문 취소 (WebSocket API 사용, DRY_RUN 지원)"""
     if settings.DRY_RUN:
-        log.info(f"[DRY RUN] Cancel orderId={order_id}")
+        log.info("[DRY RUN] Cancel orderId=%s", order_id)
         return {"orderId": order_id, "status": "CANCELED", "simulated": True}
 
-    assert client, "AsyncClient not injected"
+    c = _require_client()
     # WebSocket API를 사용한 주문 취소
-    resp = await client.ws_futures_cancel_order(symbol=settings.SYMBOL, orderId=order_id)
-    log.info(f"Canceled order {order_id}: status={resp.get('status')}")
+    resp = await c.ws_futures_cancel_order(symbol=settings.SYMBOL, orderId=order_id)
+    log.info("Canceled order %s: status=%s", order_id, resp.get("status"))
     return resp
 
 async def get_open_orders():
@@ -71,14 +222,14 @@ async def get_open_orders():
         log.info("[DRY RUN] get_open_orders")
         return []
 
-    assert client, "AsyncClient not injected"
-    orders = await client.futures_get_open_orders(symbol=settings.SYMBOL)
+    c = _require_client()
+    orders = await c.futures_get_open_orders(symbol=settings.SYMBOL)
     return orders
 
 async def get_order(symbol: str, order_id: int):
     """특정 주문 상태 조회 (DRY_RUN 지원)"""
     if settings.DRY_RUN:
-        log.info(f"[DRY RUN] get_order {order_id}")
+        log.info("[DRY RUN] get_order %s", order_id)
         return {
             "orderId": order_id,
             "symbol": symbol,
@@ -88,22 +239,22 @@ async def get_order(symbol: str, order_id: int):
             "executedQty": "0"
         }
 
-    assert client, "AsyncClient not injected"
-    return await client.futures_get_order(symbol=symbol, orderId=order_id)
+    c = _require_client()
+    return await c.futures_get_order(symbol=symbol, orderId=order_id)
 
 async def get_symbol_ticker(symbol: str):
     """심볼 현재가 조회 (DRY_RUN 지원)"""
     if settings.DRY_RUN:
-        log.info(f"[DRY RUN] get_symbol_ticker {symbol}")
+        log.info("[DRY RUN] get_symbol_ticker %s", symbol)
         return {"price": "50000.0"}  # 가상 가격
 
-    assert client, "AsyncClient not injected"
-    return await client.futures_symbol_ticker(symbol=symbol)
+    c = _require_client()
+    return await c.futures_symbol_ticker(symbol=symbol)
 
 async def place_market_order(symbol: str, side: str, quantity: str):
     """시장가 주문 (DRY_RUN 지원)"""
     if settings.DRY_RUN:
-        log.info(f"[DRY RUN] {side} MARKET {symbol} qty={quantity}")
+        log.info("[DRY RUN] %s MARKET %s qty=%s", side, symbol, quantity)
         return {
             "orderId": -1,
             "symbol": symbol,
@@ -112,10 +263,20 @@ async def place_market_order(symbol: str, side: str, quantity: str):
             "fills": [{"price": "50000.0"}]
         }
 
-    assert client, "AsyncClient not injected"
-    return await client.futures_create_order(
+    c = _require_client()
+    return await c.futures_create_order(
         symbol=symbol,
         side=side,
         type="MARKET",
         quantity=quantity
     )
+
+def futures_user_socket():
+    """futures user-data 스트림 소켓 (ORDER_TRADE_UPDATE 등 주문 체결 이벤트 수신, listenKey 갱신은 라이브러리가 처리)"""
+    c = _require_client()
+    return BinanceSocketManager(c).futures_user_socket()
+
+def futures_book_ticker_socket(symbol: str):
+    """futures @bookTicker 스트림 소켓 (REST 티커 조회 대신 최우선 호가 실시간 수신)"""
+    c = _require_client()
+    return BinanceSocketManager(c).futures_multiplex_socket([f"{symbol.lower()}@bookTicker"], category="public")
@@ -1,11 +1,153 @@
 import asyncio
+import time
 import aiosqlite
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
 from config.settings import settings
 from utils.logger import log
-from datetime import datetime
+from datetime import date, timedelta
 from . import order_executor
 
+try:
+    from gui.data_broker import data_broker
+except ImportError:
+    # GUI 모듈이 없는 경우 GUI 업데이트 생략
+    data_broker = None
+
+# 자주 실행되는 쓰기 문장 (문장 문자열을 고정해 sqlite3 statement cache에서 재사용되도록)
+_SQL_INSERT_PENDING = (
+    "INSERT OR IGNORE INTO pending_orders "
+    "(order_id, symbol, side, orig_qty, strategy_type, vwap_at_entry) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_ACTIVE = (
+    "INSERT OR REPLACE INTO active_positions "
+    "(order_id, symbol, side, entry_price, quantity, strategy_type, vwap_at_entry, tp_price, sl_price) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_CLOSED = (
+    "INSERT INTO closed_positions "
+    "(order_id, symbol, side, entry_price, exit_price, quantity, pnl, strategy_type, vwap_at_entry, exit_reason) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_VWAP_HISTORY = (
+    "INSERT INTO vwap_history "
+    "(symbol, vwap, upper_band, lower_band, current_price, adx, volume_window_trades) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+# IN (...) 목록은 건수에 따라 달라지므로 자리표시자만 채워서 사용
+_SQL_DELETE_PENDING_IN = "DELETE FROM pending_orders WHERE order_id IN ({})"
+_SQL_DELETE_ACTIVE_IN = "DELETE FROM active_positions WHERE order_id IN ({})"
+
+# 더 이상 체결되지 않는 주문 상태 (부분 체결 후 CANCELED/EXPIRED면 체결분만 포지션으로 남음)
+_TERMINAL_ORDER_STATUSES = ("FILLED", "CANCELED", "EXPIRED")
+
+# DB 설정 및 스키마 (init에서 executescript 한 번으로 적용)
+# active_positions는 시작 시 한 번만 읽으므로 조회용 인덱스 불필요 (쓰기 비용만 발생)
+_SCHEMA_DDL = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA wal_autocheckpoint=1000;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-64000;
+PRAGMA busy_timeout=5000;
+
+CREATE TABLE IF NOT EXISTS pending_orders (
+    order_id INTEGER PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    orig_qty REAL NOT NULL,
+    strategy_type TEXT DEFAULT 'OBI',
+    vwap_at_entry REAL DEFAULT NULL
+);
+
+CREATE TABLE IF NOT EXISTS active_positions (
+    order_id INTEGER PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    entry_price REAL NOT NULL,
+    quantity REAL NOT NULL,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    strategy_type TEXT DEFAULT 'OBI',
+    vwap_at_entry REAL DEFAULT NULL,
+    tp_price REAL DEFAULT NULL,
+    sl_price REAL DEFAULT NULL
+);
+
+CREATE TABLE IF NOT EXISTS closed_positions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    entry_price REAL NOT NULL,
+    exit_price REAL NOT NULL,
+    quantity REAL NOT NULL,
+    pnl REAL NOT NULL,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    strategy_type TEXT DEFAULT 'OBI',
+    vwap_at_entry REAL DEFAULT NULL,
+    exit_reason TEXT DEFAULT 'TP_SL'
+);
+-- 기간별 리포팅 조회용
+CREATE INDEX IF NOT EXISTS idx_closed_ts ON closed_positions(timestamp);
+
+-- VWAP 히스토리 테이블
+CREATE TABLE IF NOT EXISTS vwap_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    symbol TEXT NOT NULL,
+    vwap REAL NOT NULL,
+    upper_band REAL,
+    lower_band REAL,
+    current_price REAL,
+    adx REAL,
+    volume_window_trades INTEGER DEFAULT 0
+);
+-- 심볼별 최근 구간 조회 (get_vwap_history / 차트)
+CREATE INDEX IF NOT EXISTS idx_vwap_sym_ts ON vwap_history(symbol, timestamp);
+"""
+
+
+class OrderFill(NamedTuple):
+    """체결 정보 (Binance 문자열 필드는 파싱 시 한 번만 float로 변환)"""
+    entry_price: float
+    executed_qty: float
+
+
+class ActivePosition(NamedTuple):
+    """active_positions 행 (컬럼 순서 그대로라 executemany 파라미터로 바로 사용)"""
+    order_id: int
+    symbol: str
+    side: str
+    entry_price: float
+    quantity: float
+    strategy_type: str
+    vwap_at_entry: Optional[float]
+    tp_price: Optional[float]
+    sl_price: Optional[float]
+
+
+def _parse_fill(avg_price: Optional[str], price: Optional[str], executed_qty: Optional[str],
+                orig_qty: float) -> OrderFill:
+    """평균 체결가가 없거나 0이면 주문가, 체결 수량이 없으면 주문 수량 사용"""
+    entry_price = float(avg_price or 0) or float(price)
+    return OrderFill(entry_price, float(executed_qty) if executed_qty else orig_qty)
+
+
+def _placeholders(n: int) -> str:
+    """IN (...) 절용 바인딩 자리표시자 (한 문장으로 여러 행을 삭제해 문장 준비/워커 왕복을 1회로)"""
+    return ",".join("?" * n)
+
+
+def _parse_exit_price(order: Dict, fallback_price: float) -> float:
+    """
+    청산 시장가 주문 응답의 체결가: fills(DRY_RUN/spot 형식) → avgPrice(futures) → 판단 시점 가격 순으로 사용
+    (futures 주문 응답에는 fills가 없고, ACK 응답이면 avgPrice가 "0"일 수 있음)
+    """
+    fills = order.get("fills")
+    if fills:
+        return float(fills[0]["price"])
+    return float(order.get("avgPrice") or 0) or fallback_price
+
 
 class PositionManager:
     """
@@ -15,91 +157,100 @@ class PositionManager:
      - 주문이 들어오면 pending_orders 테이블에 저장 (strategy context 포함)
      - DB에 남은 pending_orders, active_positions를 재시작 시 로드
      - 백그라운드 루프:
-         1) pending_orders 테이블의 주문을 주기적으로 get_order()로 확인 →
-            FILLED 되면 active_positions 테이블에 옮겨 등록
+         1) user-data 스트림의 ORDER_TRADE_UPDATE로 체결 즉시 active_positions 테이블에 옮겨 등록
+            (pending_orders 테이블은 get_order()로 주기적으로 대조, 스트림 단절 시 매 루프 폴링)
          2) active_positions 테이블의 각 포지션을 strategy-specific TP/SL 조건 비교 →
             조건 만족 시 시장가 청산 → closed_positions 테이블에 기록
     └────────────────────────────────────────────────────────────────────────┘
     """
+    # 주문 조회 / 청산 주문 REST 동시 요청 상한 (Binance request weight 보호)
+    MAX_CONCURRENT_ORDER_REQUESTS = 10
+    # user-data 스트림 연결 중 REST 대조 주기 / 스트림 재연결 대기 (초)
+    RECONCILE_INTERVAL = 30.0
+    STREAM_RETRY_DELAY = 5.0
+    # Total PnL 변화 로그 최소 간격 (초)
+    PNL_LOG_INTERVAL = 10.0
+    # 모니터 heartbeat 주기 (초): 이벤트가 없을 때의 최대 대기, REST 폴링/GUI 갱신/청산 실패 재시도 최소 간격
+    MONITOR_INTERVAL = 1.0
+    # writer 태스크가 한 트랜잭션(커밋 1회)으로 묶는 최대 쓰기 작업 수
+    WRITE_BATCH_MAX = 64
+
     def __init__(self):
         self.db_path = "storage/orders.db"
+        self._db: Optional[aiosqlite.Connection] = None
+        # 모든 쓰기(register_order / 체결 / 청산 / VWAP 히스토리)는 이 큐를 통해 writer 태스크 하나가 처리
+        # 동시에 쌓인 작업은 한 트랜잭션으로 묶어 커밋 (None은 종료 신호)
+        self._write_q: asyncio.Queue = asyncio.Queue()
+        self._writer_task = None
         self._task = None
+        self._user_stream_task = None
+        self._user_stream_active = False
+        self._price_stream_task = None
+        # bookTicker 스트림의 최신 mid 가격 (이벤트 루프 단일 스레드에서만 갱신, 스트림 단절 시 None → REST 조회)
+        self._last_price: Optional[float] = None
+        self._order_request_sem = asyncio.Semaphore(self.MAX_CONCURRENT_ORDER_REQUESTS)
         self._last_total_pnl = None
+        # 미체결 주문 메모리 인덱스: order_id → (symbol, side, orig_qty, strategy_type, vwap_at_entry)
+        # SQLite pending_orders는 재시작 복구용으로만 쓰고, 매 루프 조회는 이 dict로 처리
+        self._pending: Dict[int, Tuple[str, str, float, str, Optional[float]]] = {}
+        # 보유 포지션 메모리 인덱스: order_id → ActivePosition (SQLite active_positions는 상태 변경 시에만 기록)
+        self._active: Dict[int, ActivePosition] = {}
+        # closed_positions PnL 누적 합계 (init에서 한 번 집계 후 청산 시마다 증분 갱신)
+        self._total_pnl = 0.0
+        # 오늘 청산 통계 캐시 (init에서 한 번 집계, 청산 시 증분 갱신, 날짜가 바뀌면 초기화)
+        self._daily_stats = {"date": None, "trades": 0, "winning_trades": 0, "pnl": 0.0}
+        # 체결/가격 이벤트 시 모니터 루프를 즉시 깨움 (없으면 MONITOR_INTERVAL마다 heartbeat)
+        self._wake = asyncio.Event()
 
     async def init(self):
         """
         1. DB 연결 & 스키마 생성 (enhanced for VWAP strategy)
-        2. pending_orders / active_positions 테이블에서 기존 데이터를 메모리 없이 계속 DB로 관리
+        2. pending_orders / active_positions 테이블의 기존 데이터를 메모리 인덱스로 로드 (이후 DB는 상태 변경 기록용)
         3. 백그라운드 _monitor_positions() 실행
         """
-        # 1) DB 스키마 생성
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """
-                CREATE TABLE IF NOT EXISTS pending_orders (
-                    order_id INTEGER PRIMARY KEY,
-                    symbol TEXT NOT NULL,
-                    side TEXT NOT NULL,
-                    orig_qty REAL NOT NULL,
-                    strategy_type TEXT DEFAULT 'OBI',
-                    vwap_at_entry REAL DEFAULT NULL
-                )
-                """
-            )
-            await db.execute(
-                """
-                CREATE TABLE IF NOT EXISTS active_positions (
-                    order_id INTEGER PRIMARY KEY,
-                    symbol TEXT NOT NULL,
-                    side TEXT NOT NULL,
-                    entry_price REAL NOT NULL,
-                    quantity REAL NOT NULL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    strategy_type TEXT DEFAULT 'OBI',
-                    vwap_at_entry REAL DEFAULT NULL
-                )
-                """
-            )
-            await db.execute(
-                """
-                CREATE TABLE IF NOT EXISTS closed_positions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    order_id INTEGER NOT NULL,
-                    symbol TEXT NOT NULL,
-                    side TEXT NOT NULL,
-                    entry_price REAL NOT NULL,
-                    exit_price REAL NOT NULL,
-                    quantity REAL NOT NULL,
-                    pnl REAL NOT NULL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    strategy_type TEXT DEFAULT 'OBI',
-                    vwap_at_entry REAL DEFAULT NULL,
-                    exit_reason TEXT DEFAULT 'TP_SL'
-                )
-                """
-            )
-            
-            # VWAP 히스토리 테이블 추가
-            await db.execute(
-                """
-                CREATE TABLE IF NOT EXISTS vwap_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    symbol TEXT NOT NULL,
-                    vwap REAL NOT NULL,
-                    upper_band REAL,
-                    lower_band REAL,
-                    current_price REAL,
-                    adx REAL,
-                    volume_window_trades INTEGER DEFAULT 0
-                )
-                """
-            )
-            
-            await db.commit()
+        # 1) 영속 DB 연결 (WAL) & 스키마 생성 - 매 조회/쓰기마다 연결을 새로 열지 않고 재사용
+        # WAL + synchronous=NORMAL: commit마다 fsync하지 않고 체크포인트 때만 동기화.
+        # 전원 차단 시 마지막 체크포인트 이후 커밋 일부가 유실될 수 있지만, 프로세스 크래시에는 안전하고 DB는 항상 일관성 유지
+        self._db = db = await aiosqlite.connect(self.db_path)
+        # PRAGMA + CREATE 문 전체를 한 번의 워커 스레드 왕복으로 실행
+        await db.executescript(_SCHEMA_DDL)
+        await self._migrate_tp_sl_columns(db)
+        await db.commit()
+
+        # execute_fetchall: execute + fetchall을 워커 스레드 왕복 한 번으로 처리
+        rows = await db.execute_fetchall("SELECT SUM(pnl) FROM closed_positions")
+        self._total_pnl = rows[0][0] or 0.0
+        await self._load_daily_stats(date.today())
 
-        # 2) 백그라운드 모니터링 태스크 시작
+        rows = await db.execute_fetchall(
+            "SELECT order_id, symbol, side, orig_qty, strategy_type, vwap_at_entry FROM pending_orders"
+        )
+        self._pending = {row[0]: row[1:] for row in rows}
+
+        rows = await db.execute_fetchall(
+            """
+            SELECT order_id, symbol, side, entry_price, quantity, strategy_type, vwap_at_entry,
+                   tp_price, sl_price
+            FROM active_positions
+            """
+        )
+        self._active = {row[0]: ActivePosition(*row) for row in rows}
+
+        # 2) 백그라운드 writer / 모니터링 태스크 시작 (DRY_RUN에서는 실제 주문이 없으므로 user-data/가격 스트림 생략)
+        self._writer_task = asyncio.create_task(self._writer_loop(), name="PositionWriter")
         self._task = asyncio.create_task(self._monitor_positions(), name="PositionMonitor")
+        if not settings.DRY_RUN:
+            self._user_stream_task = asyncio.create_task(
+                self._run_stream("User data stream", order_executor.futures_user_socket,
+                                 self._on_user_data, self._set_user_stream_active),
+                name="UserDataStream"
+            )
+            self._price_stream_task = asyncio.create_task(
+                self._run_stream("Book ticker stream",
+                                 lambda: order_executor.futures_book_ticker_socket(settings.SYMBOL),
+                                 self._on_book_ticker, self._set_price_stream_active),
+                name="PositionPriceStream"
+            )
         log.info("[PositionManager] Initialized and monitor task started")
 
     async def register_order(self, order: Dict, strategy_type: str = None, vwap_at_entry: float = None):
@@ -116,165 +267,454 @@ class PositionManager:
         if strategy_type is None:
             strategy_type = settings.STRATEGY_TYPE
 
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """
-                INSERT OR IGNORE INTO pending_orders 
-                (order_id, symbol, side, orig_qty, strategy_type, vwap_at_entry)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (order_id, symbol, side, orig_qty, strategy_type, vwap_at_entry)
-            )
-            await db.commit()
+        # INSERT 커밋을 기다리는 동안 도착한 체결/취소 이벤트도 처리되도록 메모리 인덱스에 먼저 등록
+        # (이벤트의 DB 쓰기는 이 INSERT 뒤에 큐에 들어가므로 순서가 보장됨)
+        info = (symbol, side, orig_qty, strategy_type, vwap_at_entry)
+        self._pending.setdefault(order_id, info)
+        try:
+            await self._write((_SQL_INSERT_PENDING, (order_id, *info)))
+        except Exception:
+            if self._pending.get(order_id) is info:
+                del self._pending[order_id]
+            raise
 
         # Enhanced logging with strategy context
         if strategy_type == "VWAP" and vwap_at_entry:
-            log.info(f"[PositionManager] Registered pending order {order_id} ({side} {orig_qty} @ {symbol}) - Strategy: {strategy_type}, VWAP: {vwap_at_entry:.2f}")
+            log.info("[PositionManager] Registered pending order %s (%s %s @ %s) - Strategy: %s, VWAP: %.2f",
+                     order_id, side, orig_qty, symbol, strategy_type, vwap_at_entry)
         else:
-            log.info(f"[PositionManager] Registered pending order {order_id} ({side} {orig_qty} @ {symbol}) - Strategy: {strategy_type}")
+            log.info("[PositionManager] Registered pending order %s (%s %s @ %s) - Strategy: %s",
+                     order_id, side, orig_qty, symbol, strategy_type)
 
     async def _monitor_positions(self):
         """
         Enhanced position monitoring with strategy-specific TP/SL
         1) pending_orders 테이블 주문 상태 확인 → FILLED 시 active_positions 테이블로 옮기기
-        2) active_positions 테이블 포지션 TP/SL 검사 → 청산 시 closed_positions에 기록하고 active_positions에서 삭제
+        2) 보유 포지션(메모리) TP/SL 검사 → 청산 시 closed_positions에 기록하고 active_positions에서 삭제
         """
+        ticker_symbol = settings.SYMBOL  # 루프 동안 변하지 않는 설정은 한 번만 조회
+        last_reconcile = 0.0
+        last_pnl_log = 0.0
+        last_gui_update = 0.0
+        # 청산 주문 실패 포지션: order_id → 재시도 가능 시각 (가격 이벤트마다 주문이 반복 전송되지 않도록)
+        close_retry_at: Dict[int, float] = {}
         while True:
             try:
                 # ── 1) pending_orders 테이블 주문 체크 ─────────────────────────────────────────
-                async with aiosqlite.connect(self.db_path) as db:
-                    cursor = await db.execute(
-                        "SELECT order_id, symbol, side, orig_qty, strategy_type, vwap_at_entry FROM pending_orders"
-                    )
-                    rows = await cursor.fetchall()
-
-                for row in rows:
-                    order_id, symbol, side, orig_qty, strategy_type, vwap_at_entry = row
-                        
-                    # 실제 Binance 주문 상태 확인
-                    resp = await order_executor.get_order(symbol=symbol, order_id=order_id)
-                    status = resp.get("status")
-                    if status == "FILLED":
-                        entry_price = (
-                            float(resp.get("avgPrice")) if resp.get("avgPrice")
-                            else float(resp.get("price"))
-                        )
-                        executed_qty = float(resp.get("executedQty", orig_qty))
-
-                        # 1-1) active_positions 테이블에 추가
-                        async with aiosqlite.connect(self.db_path) as db:
-                            await db.execute(
-                                """
-                                INSERT OR REPLACE INTO active_positions
-                                (order_id, symbol, side, entry_price, quantity, strategy_type, vwap_at_entry)
-                                VALUES (?, ?, ?, ?, ?, ?, ?)
-                                """,
-                                (order_id, symbol, side, entry_price, executed_qty, strategy_type, vwap_at_entry)
-                            )
-                            # 1-2) pending_orders에서 삭제
-                            await db.execute(
-                                "DELETE FROM pending_orders WHERE order_id = ?",
-                                (order_id,)
-                            )
-                            await db.commit()
-
-                        log.info(
-                            f"[PositionManager] Order {order_id} FILLED → "
-                            f"Active position added (side={side}, entry_price={entry_price}, qty={executed_qty}, strategy={strategy_type})"
-                        )
+                # 체결 이벤트는 user-data 스트림이 즉시 반영하므로, 스트림이 살아있으면 REST 폴링은 주기적 대조용으로만 수행
+                # (이벤트로 루프가 자주 깨어나도 REST 폴링은 최소 MONITOR_INTERVAL 간격 유지)
+                now = time.monotonic()
+                reconcile_interval = self.RECONCILE_INTERVAL if self._user_stream_active else self.MONITOR_INTERVAL
+                if now - last_reconcile >= reconcile_interval:
+                    last_reconcile = now
+                    await self._reconcile_pending_orders()
 
                 # ── 2) active_positions TP/SL 체크 ─────────────────────────────────────────────
-                # 현재가 가져오기 (여기서는 단일 심볼 가정. 멀티심볼은 각 심볼별 조회 또는 WebSocket 유지)
-                ticker = await order_executor.get_symbol_ticker(symbol=settings.SYMBOL)
-                current_price = float(ticker["price"])
+                # 현재가: 보유 포지션의 심볼별로 한 번만 조회 (SYMBOL은 bookTicker 스트림 가격 우선)
+                prices = await self._current_prices({position.symbol for position in self._active.values()},
+                                                    ticker_symbol)
 
-                async with aiosqlite.connect(self.db_path) as db:
-                    cursor = await db.execute(
-                        "SELECT order_id, symbol, side, entry_price, quantity, strategy_type, vwap_at_entry FROM active_positions"
-                    )
-                    active_rows = await cursor.fetchall()
-
-                for row in active_rows:
-                    order_id, symbol, side, entry_price, qty, strategy_type, vwap_at_entry = row
-                    
-                    # Strategy-specific TP/SL calculation
-                    if strategy_type == "VWAP":
-                        tp_pct = settings.VWAP_PROFIT_TARGET  # 0.6%
-                        sl_pct = settings.VWAP_STOP_LOSS      # 0.3%
-                    else:
-                        tp_pct = settings.TP_PCT  # Existing OBI values
-                        sl_pct = settings.SL_PCT
-                    
-                    # Check exit conditions
+                # 보유 포지션은 메모리에서 검사 (정상 상태에서는 SELECT 없음)
+                to_close = []
+                for position in self._active.values():
+                    current_price = prices.get(position.symbol)
+                    if current_price is None or close_retry_at.get(position.order_id, 0.0) > now:
+                        continue
+                    # Check exit conditions (TP/SL 가격은 체결 시 미리 계산됨)
                     should_close, exit_reason = self._check_exit_conditions(
-                        side, entry_price, current_price, tp_pct, sl_pct, vwap_at_entry
+                        position.side, current_price, position.tp_price, position.sl_price,
+                        position.vwap_at_entry
                     )
-                    
                     if should_close:
-                        # Execute market order for position closure
-                        market_side = "SELL" if side == "BUY" else "BUY"
-                        market_order = await order_executor.place_market_order(
-                            symbol=symbol,
-                            side=market_side,
-                            quantity=f"{qty:.6f}"
-                        )
-                        exit_price = float(market_order["fills"][0]["price"])
+                        to_close.append((position, exit_reason, current_price))
+
+                # 청산 기록은 모아서 한 번에 커밋 (시장가 주문이 나간 뒤 예외가 나도 기록은 남도록 finally에서 반영)
+                closed_positions = []
+                try:
+                    # Execute market orders for position closure - 순차 await 대신 동시에 전송해 RTT를 겹침
+                    responses = await asyncio.gather(
+                        *(self._place_close_order(position.symbol, position.side, position.quantity)
+                          for position, _, _ in to_close),
+                        return_exceptions=True
+                    )
+                    for (position, exit_reason, current_price), market_order in zip(to_close, responses):
+                        order_id, symbol, side, entry_price, qty, strategy_type, vwap_at_entry = position[:7]
+                        if isinstance(market_order, Exception):
+                            # 실패한 포지션은 보유 목록에 남아 MONITOR_INTERVAL 후 다시 청산 시도
+                            log.error("[PositionManager] Failed to close position %s: %s", order_id, market_order)
+                            close_retry_at[order_id] = now + self.MONITOR_INTERVAL
+                            continue
+                        close_retry_at.pop(order_id, None)
+
+                        exit_price = _parse_exit_price(market_order, current_price)
                         pnl = self._calculate_pnl(side, entry_price, exit_price, qty)
-                        
+
                         # Record in closed_positions with enhanced data
-                        async with aiosqlite.connect(self.db_path) as db:
-                            await db.execute(
-                                """
-                                INSERT INTO closed_positions
-                                (order_id, symbol, side, entry_price, exit_price, quantity, pnl,
-                                 strategy_type, vwap_at_entry, exit_reason)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                                """,
-                                (order_id, symbol, side, entry_price, exit_price, qty, pnl,
-                                 strategy_type, vwap_at_entry, exit_reason)
-                            )
-                            await db.execute(
-                                "DELETE FROM active_positions WHERE order_id = ?",
-                                (order_id,)
-                            )
-                            await db.commit()
-                        
-                        log.info(f"[PositionManager] Closed {strategy_type} {side} {order_id} @ {exit_price} / PnL={pnl:.6f} / Reason={exit_reason}")
-
-                # ── 3) 전체 PnL 누적 합계 로그 (변화가 있을 때만) ─────────────────────────────────────
-                async with aiosqlite.connect(self.db_path) as db:
-                    cursor = await db.execute("SELECT SUM(pnl) FROM closed_positions")
-                    row = await cursor.fetchone()
-                    total_pnl = row[0] or 0.0
+                        closed_positions.append(
+                            (order_id, symbol, side, entry_price, exit_price, qty, pnl,
+                             strategy_type, vwap_at_entry, exit_reason)
+                        )
+
+                        log.info("[PositionManager] Closed %s %s %s @ %s / PnL=%.6f / Reason=%s",
+                                 strategy_type, side, order_id, exit_price, pnl, exit_reason)
+                finally:
+                    if closed_positions:
+                        closed_ids = tuple(position[0] for position in closed_positions)
+                        await self._write(
+                            (_SQL_INSERT_CLOSED, closed_positions),
+                            (_SQL_DELETE_ACTIVE_IN.format(_placeholders(len(closed_ids))), closed_ids)
+                        )
+                        for position in closed_positions:
+                            self._active.pop(position[0], None)
+                        self._record_closed_pnls([position[6] for position in closed_positions])
+
+                # ── 3) 전체 PnL 누적 합계 로그 (변화가 있을 때만, 매 루프 SUM 집계 대신 누적값 사용) ─────────
+                total_pnl = self._total_pnl
                 
-                # PnL 변화 감지 및 로깅 (임계값: 0.01)
+                # PnL 변화 감지 및 로깅 (임계값: 0.01, 최소 PNL_LOG_INTERVAL 간격)
                 if self._last_total_pnl is None:
                     # 첫 번째 로깅
-                    log.info(f"[PositionManager] Initial total PnL = {total_pnl:.6f}")
+                    log.info("[PositionManager] Initial total PnL = %.6f", total_pnl)
                     self._last_total_pnl = total_pnl
-                elif abs(total_pnl - self._last_total_pnl) >= 0.01:
+                    last_pnl_log = time.monotonic()
+                elif abs(total_pnl - self._last_total_pnl) >= 0.01 and now - last_pnl_log >= self.PNL_LOG_INTERVAL:
                     # 변화가 임계값 이상일 때만 로깅
-                    change = total_pnl - self._last_total_pnl
-                    log.info(f"[PositionManager] Total PnL changed: {self._last_total_pnl:.6f} → {total_pnl:.6f} (Δ{change:+.6f})")
+                    log.info("[PositionManager] Total PnL changed: %.6f → %.6f (Δ%+.6f)",
+                             self._last_total_pnl, total_pnl, total_pnl - self._last_total_pnl)
                     self._last_total_pnl = total_pnl
+                    last_pnl_log = now
                 
-                # GUI 데이터 업데이트
-                await self.update_gui_data()
+                # GUI 데이터 업데이트 (heartbeat 주기로만)
+                if now - last_gui_update >= self.MONITOR_INTERVAL:
+                    last_gui_update = now
+                    await self.update_gui_data()
 
-                await asyncio.sleep(1.0)  # 1초마다 체크
+                # 다음 체결/가격 이벤트 또는 heartbeat까지 대기
+                # (wait_for는 Python 3.11에서 이벤트 set과 동시에 들어온 cancel을 삼켜 close()가 멈출 수 있어 timeout 사용)
+                try:
+                    async with asyncio.timeout(self.MONITOR_INTERVAL):
+                        await self._wake.wait()
+                except TimeoutError:
+                    pass
+                self._wake.clear()
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                log.error(f"[PositionManager] Exception in monitor loop: {e}", exc_info=True)
-                await asyncio.sleep(1.0)
+                log.error("[PositionManager] Exception in monitor loop: %s", e, exc_info=True)
+                await asyncio.sleep(self.MONITOR_INTERVAL)
+
+    async def _reconcile_pending_orders(self):
+        """
+        미체결 주문을 REST로 조회해 종료된 주문을 정리 (스트림 이벤트 누락 대비)
+        체결분이 있는 주문은 active_positions로 옮기고, 체결 없이 취소/만료된 주문은 pending에서 삭제
+        """
+        if not self._pending:
+            return
+
+        # 조회 중(await) user-data 스트림이 dict를 바꿀 수 있으므로 스냅샷으로 순회
+        pending = list(self._pending.items())
+
+        # 종료된 주문은 모아서 한 번의 트랜잭션으로 반영
+        filled_positions = []
+        dropped_ids = []
+        # 실제 Binance 주문 상태 확인 - 순차 await 대신 동시에 요청해 RTT를 겹침
+        responses = await asyncio.gather(
+            *(self._fetch_order(info[0], order_id) for order_id, info in pending),
+            return_exceptions=True
+        )
+        for (order_id, info), resp in zip(pending, responses):
+            if isinstance(resp, Exception):
+                log.error("[PositionManager] Failed to query order %s: %s", order_id, resp)
+                continue
+            if order_id not in self._pending:
+                # 조회 중 스트림 이벤트로 이미 처리됨
+                continue
+
+            status = resp.get("status")
+            if status in _TERMINAL_ORDER_STATUSES:
+                position = self._settle_order(order_id, info, status, resp.get("avgPrice"), resp.get("price"),
+                                              resp.get("executedQty"))
+                if position is None:
+                    dropped_ids.append(order_id)
+                else:
+                    filled_positions.append(position)
+
+        await self._settle_orders(filled_positions, dropped_ids)
+
+    def _settle_order(self, order_id: int, info: Tuple, status: str, avg_price: Optional[str],
+                      price: Optional[str], executed_qty: Optional[str]) -> Optional[ActivePosition]:
+        """
+        종료 상태(FILLED/CANCELED/EXPIRED) 주문 → active_positions로 옮길 행, 체결분이 없으면 None (pending 삭제 대상)
+        GTX 주문이 일부 체결된 뒤 만료/취소되면 거래소에는 체결분만큼 포지션이 남으므로 TP/SL 관리 대상에 포함
+        (user-data 스트림 / REST 대조가 같은 규칙을 쓰도록 공통 처리)
+        """
+        symbol, side, orig_qty, strategy_type, vwap_at_entry = info
+        if status != "FILLED" and float(executed_qty or 0) <= 0:
+            log.info("[PositionManager] Order %s %s → removed from pending orders", order_id, status)
+            return None
+        fill = _parse_fill(avg_price, price, executed_qty, orig_qty)
+        return self._filled_position(order_id, symbol, side, fill, strategy_type, vwap_at_entry, status, orig_qty)
+
+    def _filled_position(self, order_id: int, symbol: str, side: str, fill: OrderFill,
+                         strategy_type: str, vwap_at_entry: float, status: str = "FILLED",
+                         orig_qty: Optional[float] = None) -> ActivePosition:
+        """active_positions 행 생성 (TP/SL 가격은 진입가가 고정이므로 체결 시 한 번만 계산해 저장)"""
+        entry_price, executed_qty = fill
+        tp_price, sl_price = self._tp_sl_prices(side, entry_price, strategy_type)
+        if status == "FILLED":
+            log.info(
+                "[PositionManager] Order %s FILLED → Active position added "
+                "(side=%s, entry_price=%s, qty=%s, strategy=%s)",
+                order_id, side, entry_price, executed_qty, strategy_type
+            )
+        else:
+            log.info(
+                "[PositionManager] Order %s %s after partial fill → Active position added "
+                "(side=%s, entry_price=%s, qty=%s of %s, strategy=%s)",
+                order_id, status, side, entry_price, executed_qty, orig_qty, strategy_type
+            )
+        return ActivePosition(order_id, symbol, side, entry_price, executed_qty, strategy_type, vwap_at_entry,
+                              tp_price, sl_price)
+
+    async def _settle_orders(self, filled_positions: List[ActivePosition], dropped_ids: Sequence[int] = ()):
+        """
+        체결된 주문은 active_positions에 추가하고, 체결 없이 종료된 주문(dropped_ids)과 함께
+        pending_orders에서 삭제 (한 번의 커밋)
+        """
+        if not filled_positions and not dropped_ids:
+            return
+
+        settled_ids = tuple(position.order_id for position in filled_positions) + tuple(dropped_ids)
+        statements = [(_SQL_DELETE_PENDING_IN.format(_placeholders(len(settled_ids))), settled_ids)]
+        if filled_positions:
+            statements.insert(0, (_SQL_INSERT_ACTIVE, filled_positions))
+        await self._write(*statements)
+        for order_id in settled_ids:
+            self._pending.pop(order_id, None)
+        for position in filled_positions:
+            self._active[position.order_id] = position
+
+    async def _run_stream(self, name: str, open_stream: Callable, on_msg: Callable[[Dict], Awaitable[None]],
+                          on_state: Callable[[bool], None]):
+        """
+        WebSocket 스트림 수신 루프: 단절 시 STREAM_RETRY_DELAY 후 재연결
+        on_state(True/False)로 연결 상태를 알려 그 사이에는 REST 조회로 대체하도록 함
+        """
+        while True:
+            try:
+                async with open_stream() as stream:
+                    on_state(True)
+                    log.info("[PositionManager] %s connected", name)
+                    recv = stream.recv
+                    while True:
+                        msg = await recv()
+                        # 소켓 오류는 {"e": "error", ...} 메시지로 전달됨
+                        if msg.get("e") == "error":
+                            raise ConnectionError(f"{msg.get('type')}: {msg.get('m')}")
+                        await on_msg(msg)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("[PositionManager] %s error: %s", name, e)
+            finally:
+                on_state(False)
+            await asyncio.sleep(self.STREAM_RETRY_DELAY)
+
+    def _set_user_stream_active(self, active: bool):
+        self._user_stream_active = active
+
+    def _set_price_stream_active(self, active: bool):
+        # 단절된 동안 오래된 가격으로 TP/SL을 판단하지 않도록 비움
+        if not active:
+            self._last_price = None
+
+    async def _on_book_ticker(self, msg: Dict):
+        """combined stream bookTicker 메시지 → 최신 mid 가격 저장"""
+        data = msg.get("data")
+        if data is not None and data.get("e") == "bookTicker":
+            self._last_price = (float(data["b"]) + float(data["a"])) * 0.5
+            if self._active:
+                # 보유 포지션이 있을 때만 새 가격으로 TP/SL 즉시 검사
+                self._wake.set()
+
+    async def _on_user_data(self, msg: Dict):
+        """user-data 이벤트 중 ORDER_TRADE_UPDATE만 처리"""
+        if msg.get("e") == "ORDER_TRADE_UPDATE":
+            await self._on_order_update(msg["o"])
+
+    async def _on_order_update(self, order: Dict):
+        """ORDER_TRADE_UPDATE 페이로드('o') 처리: 종료 상태(FILLED/CANCELED/EXPIRED) 주문을 _settle_order 규칙으로 정리"""
+        status = order.get("X")
+        if status not in _TERMINAL_ORDER_STATUSES:
+            return
+
+        order_id = int(order["i"])
+        info = self._pending.get(order_id)
+        if info is None:
+            # 이 매니저가 등록하지 않은 주문 (청산용 시장가 주문 등)
+            return
+
+        # 'z': 누적 체결 수량 (부분 체결 후 취소/만료여도 체결분은 포지션으로 남음)
+        position = self._settle_order(order_id, info, status, order.get("ap"), order.get("p"), order.get("z"))
+        if position is None:
+            await self._settle_orders([], (order_id,))
+        else:
+            await self._settle_orders([position])
+            self._wake.set()
+
+    async def _write(self, *statements: Tuple[str, Any]):
+        """
+        쓰기 작업을 writer 태스크에 넘기고 커밋될 때까지 대기
+        statements: (sql, params) 목록 - 한 작업 안의 문장들은 원자적으로 반영, params가 list면 executemany
+        """
+        if self._writer_task is None:
+            raise RuntimeError("PositionManager writer is not running")
+        done = asyncio.get_running_loop().create_future()
+        self._write_q.put_nowait((statements, done))
+        await done
+
+    async def _writer_loop(self):
+        """DB 쓰기 전용 태스크: 큐에 쌓인 작업을 모아서 한 트랜잭션으로 커밋 (작업별 SAVEPOINT로 실패 격리)"""
+        db = self._db
+        write_q = self._write_q
+        while True:
+            batch = [await write_q.get()]
+            while len(batch) < self.WRITE_BATCH_MAX and not write_q.empty():
+                batch.append(write_q.get_nowait())
+
+            # None은 종료 신호 (종료 전 남은 작업은 반영)
+            stop = None in batch
+            batch = [item for item in batch if item is not None]
+
+            if batch:
+                results = []
+                try:
+                    await db.execute("BEGIN")
+                    for statements, _ in batch:
+                        await db.execute("SAVEPOINT write_op")
+                        try:
+                            for sql, params in statements:
+                                if isinstance(params, list):
+                                    await db.executemany(sql, params)
+                                else:
+                                    await db.execute(sql, params)
+                        except Exception as e:
+                            await db.execute("ROLLBACK TO write_op")
+                            results.append(e)
+                        else:
+                            results.append(None)
+                        await db.execute("RELEASE write_op")
+                    await db.commit()
+                except Exception as e:
+                    # BEGIN/COMMIT 실패 → 배치 전체 실패
+                    log.error("[PositionManager] DB write batch failed: %s", e)
+                    try:
+                        await db.rollback()
+                    except Exception:
+                        pass
+                    results = [e] * len(batch)
+
+                for (_, done), error in zip(batch, results):
+                    if done.done():
+                        # 호출한 쪽이 취소됨 (작업 자체는 반영됨)
+                        continue
+                    if error is None:
+                        done.set_result(None)
+                    else:
+                        done.set_exception(error)
+
+            if stop:
+                return
+
+    async def _fetch_order(self, symbol: str, order_id: int) -> Dict:
+        """세마포어로 동시 요청 수를 제한한 주문 상태 조회"""
+        async with self._order_request_sem:
+            return await order_executor.get_order(symbol=symbol, order_id=order_id)
+
+    async def _current_prices(self, symbols: set, stream_symbol: str) -> Dict[str, float]:
+        """
+        심볼별 현재가: stream_symbol은 bookTicker 캐시 사용, 나머지(또는 스트림 연결 전/단절 시)는
+        심볼당 한 번씩 REST 동시 조회 (포지션 수가 아니라 고유 심볼 수만큼만 요청)
+        """
+        prices = {}
+        if stream_symbol in symbols and self._last_price is not None:
+            prices[stream_symbol] = self._last_price
+
+        missing = [symbol for symbol in symbols if symbol not in prices]
+        if missing:
+            tickers = await asyncio.gather(*(self._fetch_ticker(symbol) for symbol in missing),
+                                           return_exceptions=True)
+            for symbol, ticker in zip(missing, tickers):
+                if isinstance(ticker, Exception):
+                    # 해당 심볼 포지션은 이번 루프에서 검사 생략
+                    log.error("[PositionManager] Failed to fetch %s price: %s", symbol, ticker)
+                    continue
+                prices[symbol] = float(ticker["price"])
+        return prices
+
+    async def _fetch_ticker(self, symbol: str) -> Dict:
+        """세마포어로 동시 요청 수를 제한한 현재가 조회"""
+        async with self._order_request_sem:
+            return await order_executor.get_symbol_ticker(symbol=symbol)
+
+    async def _place_close_order(self, symbol: str, side: str, qty: float) -> Dict:
+        """포지션 반대 방향 시장가 청산 주문 (조회와 같은 세마포어로 동시 요청 수 제한)"""
+        market_side = "SELL" if side == "BUY" else "BUY"
+        async with self._order_request_sem:
+            return await order_executor.place_market_order(
+                symbol=symbol,
+                side=market_side,
+                quantity=f"{qty:.6f}"
+            )
+
+    async def _migrate_tp_sl_columns(self, db: aiosqlite.Connection):
+        """기존 DB의 active_positions에 tp_price/sl_price 컬럼 추가 및 값 채우기"""
+        columns = [col[1] for col in await db.execute_fetchall("PRAGMA table_info(active_positions)")]
+        missing = [column for column in ("tp_price", "sl_price") if column not in columns]
+        if missing:
+            # 누락 컬럼 ALTER를 한 스크립트로 실행
+            await db.executescript("".join(
+                f"ALTER TABLE active_positions ADD COLUMN {column} REAL DEFAULT NULL;" for column in missing
+            ))
+            log.info("[PositionManager] Added active_positions columns: %s", ", ".join(missing))
+
+        rows = await db.execute_fetchall(
+            "SELECT order_id, side, entry_price, strategy_type FROM active_positions "
+            "WHERE tp_price IS NULL OR sl_price IS NULL"
+        )
+        updates = []
+        for order_id, side, entry_price, strategy_type in rows:
+            try:
+                updates.append((*self._tp_sl_prices(side, entry_price, strategy_type), order_id))
+            except AttributeError as e:
+                # 현재 로드된 전략 설정에 해당 전략의 TP/SL 값이 없는 경우
+                log.warning("[PositionManager] Cannot backfill TP/SL for position %s: %s", order_id, e)
+        if updates:
+            await db.executemany(
+                "UPDATE active_positions SET tp_price = ?, sl_price = ? WHERE order_id = ?",
+                updates
+            )
+
+    def _tp_sl_prices(self, side: str, entry_price: float, strategy_type: str) -> Tuple[float, float]:
+        """Strategy-specific TP/SL price levels for a new position"""
+        if strategy_type == "VWAP":
+            tp_pct = settings.VWAP_PROFIT_TARGET  # 0.6%
+            sl_pct = settings.VWAP_STOP_LOSS      # 0.3%
+        else:
+            tp_pct = settings.TP_PCT  # Existing OBI values
+            sl_pct = settings.SL_PCT
+
+        if side == "BUY":
+            return entry_price * (1 + tp_pct), entry_price * (1 - sl_pct)
+        return entry_price * (1 - tp_pct), entry_price * (1 + sl_pct)
+
+    def _check_exit_conditions(self, side: str, current_price: float, tp_price: float,
+                              sl_price: float, vwap_at_entry: float = None) -> Tuple[bool, str]:
+        """Check if position should be closed and return reason (TP/SL 미설정 포지션은 VWAP 회귀만 검사)"""
+        if tp_price is None or sl_price is None:
+            tp_price = sl_price = float("nan")
 
-    def _check_exit_conditions(self, side: str, entry_price: float, current_price: float, 
-                              tp_pct: float, sl_pct: float, vwap_at_entry: float = None) -> Tuple[bool, str]:
-        """Check if position should be closed and return reason"""
         if side == "BUY":
-            tp_price = entry_price * (1 + tp_pct)
-            sl_price = entry_price * (1 - sl_pct)
-            
             if current_price >= tp_price:
                 return True, "PROFIT_TARGET"
             elif current_price <= sl_price:
@@ -284,9 +724,6 @@ class PositionManager:
                 return True, "VWAP_REVERSION"
                 
         elif side == "SELL":
-            tp_price = entry_price * (1 - tp_pct)
-            sl_price = entry_price * (1 + sl_pct)
-            
             if current_price <= tp_price:
                 return True, "PROFIT_TARGET"
             elif current_price >= sl_price:
@@ -304,139 +741,138 @@ class PositionManager:
         else:  # SELL
             return (entry_price - exit_price) * quantity
 
+    async def _load_daily_stats(self, today: date):
+        """오늘 청산 통계를 한 번 집계해 메모리 캐시에 로드 (이후에는 청산 시마다 증분 갱신)"""
+        # DATE(timestamp) = ? 는 인덱스를 못 타므로 idx_closed_ts 범위 조건으로 조회
+        rows = await self._db.execute_fetchall(
+            """
+            SELECT COUNT(*), SUM(CASE WHEN pnl > 0 THEN 1 ELSE 0 END), SUM(pnl)
+            FROM closed_positions
+            WHERE timestamp >= ? AND timestamp < ?
+            """,
+            (today.isoformat(), (today + timedelta(days=1)).isoformat())
+        )
+        trades, winning_trades, pnl = rows[0]
+        self._daily_stats = {"date": today.isoformat(), "trades": trades, "winning_trades": winning_trades or 0,
+                             "pnl": pnl or 0.0}
+
+    def _daily_stats_for(self, today: str) -> Dict:
+        """날짜가 바뀌었으면 일일 통계를 0부터 다시 시작"""
+        stats = self._daily_stats
+        if stats["date"] != today:
+            stats = self._daily_stats = {"date": today, "trades": 0, "winning_trades": 0, "pnl": 0.0}
+        return stats
+
+    def _record_closed_pnls(self, pnls: List[float]):
+        """청산 기록 커밋 후 누적/일일 PnL 캐시 갱신"""
+        self._total_pnl += sum(pnls)
+        stats = self._daily_stats_for(date.today().isoformat())
+        stats["trades"] += len(pnls)
+        stats["winning_trades"] += sum(1 for pnl in pnls if pnl > 0)
+        stats["pnl"] += sum(pnls)
+
     async def get_portfolio_stats(self) -> Dict:
-        """GUI용 포트폴리오 통계 조회"""
-        try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # 활성 포지션 수
-                cursor = await db.execute("SELECT COUNT(*) FROM active_positions")
-                active_count = (await cursor.fetchone())[0]
-                
-                # 오늘의 통계
-                today = datetime.now().strftime("%Y-%m-%d")
-                cursor = await db.execute("""
-                    SELECT 
-                        COUNT(*) as total_trades,
-                        SUM(CASE WHEN pnl > 0 THEN 1 ELSE 0 END) as winning_trades,
-                        SUM(pnl) as total_pnl,
-                        AVG(pnl) as avg_pnl
-                    FROM closed_positions
-                    WHERE DATE(timestamp) = ?
-                """, (today,))
-                
-                row = await cursor.fetchone()
-                if row and row[0] > 0:
-                    return {
-                        'active_positions': active_count,
-                        'total_trades': row[0],
-                        'winning_trades': row[1],
-                        'win_rate': (row[1] / row[0]) * 100 if row[0] > 0 else 0,
-                        'total_pnl': row[2] or 0,
-                        'daily_pnl': row[2] or 0,
-                        'avg_pnl': row[3] or 0
-                    }
-                else:
-                    return {
-                        'active_positions': active_count,
-                        'total_trades': 0,
-                        'winning_trades': 0,
-                        'win_rate': 0,
-                        'total_pnl': 0,
-                        'daily_pnl': 0,
-                        'avg_pnl': 0
-                    }
-        except Exception as e:
-            log.error(f"Error getting portfolio stats: {e}")
-            return {
-                'active_positions': 0,
-                'total_trades': 0,
-                'winning_trades': 0,
-                'win_rate': 0,
-                'total_pnl': 0,
-                'daily_pnl': 0,
-                'avg_pnl': 0
-            }
+        """GUI용 포트폴리오 통계 (메모리 캐시에서 계산, DB 조회 없음)"""
+        stats = self._daily_stats_for(date.today().isoformat())
+        trades = stats["trades"]
+        return {
+            'active_positions': len(self._active),
+            'total_trades': trades,
+            'winning_trades': stats["winning_trades"],
+            'win_rate': (stats["winning_trades"] / trades) * 100 if trades > 0 else 0,
+            'total_pnl': self._total_pnl,
+            'daily_pnl': stats["pnl"],
+            'avg_pnl': stats["pnl"] / trades if trades > 0 else 0
+        }
     
     async def update_gui_data(self):
         """GUI 데이터 브로커 업데이트"""
+        # GUI 데이터 브로커가 있는 경우에만 업데이트
+        if data_broker is None:
+            return
+        
         try:
-            # GUI 데이터 브로커가 있는 경우에만 업데이트
-            try:
-                from gui.data_broker import data_broker
-                stats = await self.get_portfolio_stats()
-                data_broker.update_portfolio(**stats)
-            except ImportError:
-                # GUI 모듈이 없는 경우 무시
-                pass
+            stats = await self.get_portfolio_stats()
+            # update_portfolio가 받는 항목만 전달
+            data_broker.update_portfolio(
+                total_pnl=stats['total_pnl'],
+                daily_pnl=stats['daily_pnl'],
+                active_positions=stats['active_positions'],
+                total_trades=stats['total_trades'],
+                win_rate=stats['win_rate']
+            )
         except Exception as e:
-            log.debug(f"GUI update failed: {e}")
+            log.debug("GUI update failed: %s", e)
 
     async def close(self):
         """
         외부에서 PositionManager를 종료할 때 호출
         """
-        if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
+        for task in (self._task, self._user_stream_task, self._price_stream_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
         log.info("[PositionManager] Monitor task cancelled")
 
+        # 남은 쓰기 작업을 반영한 뒤 writer 종료
+        if self._writer_task:
+            self._write_q.put_nowait(None)
+            await self._writer_task
+            self._writer_task = None
+        
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
     async def save_vwap_history(self, symbol: str, vwap: float, upper_band: float = None, 
                                lower_band: float = None, current_price: float = None, 
                                adx: float = None, volume_window_trades: int = 0):
         """VWAP 히스토리 데이터를 DB에 저장"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute(
-                    """
-                    INSERT INTO vwap_history 
-                    (symbol, vwap, upper_band, lower_band, current_price, adx, volume_window_trades)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (symbol, vwap, upper_band, lower_band, current_price, adx, volume_window_trades)
-                )
-                await db.commit()
+            await self._write(
+                (_SQL_INSERT_VWAP_HISTORY, (symbol, vwap, upper_band, lower_band, current_price, adx,
+                                            volume_window_trades))
+            )
         except Exception as e:
-            log.error(f"Error saving VWAP history: {e}")
+            log.error("Error saving VWAP history: %s", e)
     
     async def get_vwap_history(self, symbol: str, hours: int = 1) -> list:
         """지정된 시간 동안의 VWAP 히스토리 조회"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                cursor = await db.execute(
-                    """
-                    SELECT timestamp, vwap, upper_band, lower_band, current_price, adx
-                    FROM vwap_history 
-                    WHERE symbol = ? AND timestamp >= datetime('now', '-{} hours')
-                    ORDER BY timestamp ASC
-                    """.format(hours),
-                    (symbol,)
-                )
-                rows = await cursor.fetchall()
-                return [
-                    {
-                        'timestamp': row[0],
-                        'vwap': row[1],
-                        'upper_band': row[2],
-                        'lower_band': row[3],
-                        'current_price': row[4],
-                        'adx': row[5]
-                    }
-                    for row in rows
-                ]
+            db = self._db
+            rows = await db.execute_fetchall(
+                """
+                SELECT timestamp, vwap, upper_band, lower_band, current_price, adx
+                FROM vwap_history 
+                WHERE symbol = ? AND timestamp >= datetime('now', ?)
+                ORDER BY timestamp ASC
+                """,
+                (symbol, f"-{int(hours)} hours")
+            )
+            return [
+                {
+                    'timestamp': row[0],
+                    'vwap': row[1],
+                    'upper_band': row[2],
+                    'lower_band': row[3],
+                    'current_price': row[4],
+                    'adx': row[5]
+                }
+                for row in rows
+            ]
         except Exception as e:
-            log.error(f"Error getting VWAP history: {e}")
+            log.error("Error getting VWAP history: %s", e)
             return []
     
     async def cleanup_old_vwap_history(self, days: int = 7):
         """오래된 VWAP 히스토리 데이터 정리"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute(
-                    "DELETE FROM vwap_history WHERE timestamp < datetime('now', '-{} days')".format(days)
-                )
-                await db.commit()
+            await self._write((
+                "DELETE FROM vwap_history WHERE timestamp < datetime('now', ?)",
+                (f"-{int(days)} days",)
+            ))
         except Exception as e:
-            log.error(f"Error cleaning up VWAP history: {e}")
+            log.error("Error cleaning up VWAP history: %s", e)
@@ -7,6 +7,10 @@ import numpy as np
 import aiosqlite
 
 
+# 마지막으로 생성한 가격 차트 (차트에 표시되는 상태가 그대로면 재사용)
+_last_chart_key = None
+_last_chart = None
+
 
 async def get_vwap_history_from_db(points_needed: int):
     """DB에서 VWAP 히스토리 데이터 조회"""
@@ -17,7 +21,7 @@ async def get_vwap_history_from_db(points_needed: int):
         limit = max(points_needed * 2, 100)
         
         async with aiosqlite.connect("storage/orders.db") as db:
-            cursor = await db.execute(
+            rows = await db.execute_fetchall(
                 """
                 SELECT timestamp, vwap, upper_band, lower_band, current_price, adx
                 FROM vwap_history 
@@ -27,7 +31,7 @@ async def get_vwap_history_from_db(points_needed: int):
                 """,
                 (settings.SYMBOL, limit)
             )
-            rows = await cursor.fetchall()
+            rows = list(rows)
             
             if not rows:
                 return None
@@ -126,31 +130,15 @@ async def get_real_ohlcv_data(state):
             )
             
             # OHLCV 데이터 파싱
-            times = []
-            opens = []
-            highs = []
-            lows = []
-            closes = []
-            volumes = []
+            # kline 구조: [시작시간, 시가, 고가, 저가, 종가, 거래량, ...] → 앞 6개 컬럼을 한 번에 float64 배열로 변환
+            ohlcv = np.array([kline[:6] for kline in klines], dtype=np.float64).reshape(-1, 6)
             
-            for kline in klines:
-                # kline 구조: [시작시간, 시가, 고가, 저가, 종가, 거래량, ...]
-                timestamp = int(kline[0]) / 1000  # 밀리초를 초로 변환
-                open_price = float(kline[1])
-                high_price = float(kline[2])
-                low_price = float(kline[3])
-                close_price = float(kline[4])
-                volume = float(kline[5])
-                
-                # UTC 시간을 로컬 타임으로 변환
-                utc_time = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-                local_time = utc_time.astimezone()
-                times.append(local_time)
-                opens.append(open_price)
-                highs.append(high_price)
-                lows.append(low_price)
-                closes.append(close_price)
-                volumes.append(volume)
+            # UTC 시간(밀리초)을 로컬 타임으로 변환
+            times = [
+                datetime.fromtimestamp(timestamp, tz=timezone.utc).astimezone()
+                for timestamp in (ohlcv[:, 0] / 1000).tolist()
+            ]
+            opens, highs, lows, closes, volumes = (ohlcv[:, col].tolist() for col in range(1, 6))
             
             return times, opens, highs, lows, closes, volumes
             
@@ -174,11 +162,26 @@ async def get_real_ohlcv_data(state):
 
 async def create_price_chart(state):
     """실시간 캔들스틱 차트 생성"""
+    global _last_chart_key, _last_chart
     
     try:
         if state.current_price <= 0:
             return None
         
+        # 같은 1분 캔들 구간에서 차트에 그려지는 상태가 바뀌지 않았으면 이전 차트 재사용
+        # (새로고침마다 REST 캔들 조회 + DB 조회 + plotly figure 재생성 생략)
+        chart_key = (
+            int(datetime.now().timestamp() // 60),
+            state.strategy_type,
+            state.current_price,
+            getattr(state, 'vwap', 0.0),
+            getattr(state, 'upper_band', 0.0),
+            getattr(state, 'lower_band', 0.0),
+            getattr(state, 'adx', 0.0),
+        )
+        if chart_key == _last_chart_key:
+            return _last_chart
+        
         # 1. 기본 데이터 준비
         times, opens, highs, lows, closes, volumes = await get_real_ohlcv_data(state)
         
@@ -224,6 +227,7 @@ async def create_price_chart(state):
         # 7. 차트 레이아웃 및 축 설정
         _configure_chart_layout(fig, state, highs, lows)
         
+        _last_chart_key, _last_chart = chart_key, fig
         return fig
         
     except Exception as e:
@@ -21,20 +21,28 @@ from config.settings import settings
 from utils.logger import log
 from strategy.obi_scalper import OBIScalperStrategy
 from strategy.vwap_mean_reversion import VWAPMeanReversionStrategy
-from executor.order_executor import place_limit_maker, inject_client
-from binance import AsyncClient
+from executor.order_executor import place_limit_maker, inject_client, load_symbol_filters
+from utils.binance_client import OrjsonAsyncClient
+
+try:
+    import uvloop
+except ImportError:
+    # uvloop 미지원 환경(Windows 등)에서는 기본 asyncio 이벤트 루프 사용
+    uvloop = None
 
 async def runner():
     monitor_task = asyncio.create_task(monitor_tasks(), name="TaskMonitor")
 
-    # 1) AsyncClient 생성
+    # 1) AsyncClient 생성 (REST 응답은 orjson으로 디코딩)
     kwargs = {
         "api_key": settings.BINANCE_API_KEY,
         "api_secret": settings.BINANCE_SECRET,
         "testnet": settings.TESTNET,
     }
-    client = await AsyncClient.create(**kwargs)
+    client = await OrjsonAsyncClient.create(**kwargs)
     inject_client(client)
+    # 심볼 가격/수량 단위(tickSize/stepSize) 1회 조회
+    await load_symbol_filters()
 
     # 2) PositionManager 초기화
     pos_manager = PositionManager()
@@ -72,9 +80,12 @@ async def run_vwap_strategy(pos_manager: PositionManager):
                 current_vwap = indicator_data.get('vwap', 0)
                 
                 if current_price > 0:
-                    # Place limit order at current price
+                    # Place limit order at the live best bid/ask (book ticker) so the post-only
+                    # order rests on the book; fall back to current price until the first tick
                     order_side = "BUY" if sig == "LONG" else "SELL"
-                    order = await place_limit_maker(order_side, current_price)
+                    quote = stream.best_bid if order_side == "BUY" else stream.best_ask
+                    order_price = quote if quote > 0 else current_price
+                    order = await place_limit_maker(order_side, order_price)
                     
                     # Register with position manager (enhanced with VWAP context)
                     await pos_manager.register_order(
@@ -84,7 +95,7 @@ async def run_vwap_strategy(pos_manager: PositionManager):
                     )
                     
                     # Enhanced logging with VWAP context
-                    log.info(f"[VWAP Strategy] {sig} order placed: price={current_price:.2f}, vwap={current_vwap:.2f}")
+                    log.info(f"[VWAP Strategy] {sig} order placed: price={order_price:.2f}, vwap={current_vwap:.2f}")
             
             await asyncio.sleep(0.2)  # Same cycle time as OBI strategy
             
@@ -104,7 +115,7 @@ async def run_obi_strategy(pos_manager: PositionManager):
     try:
         while True:
             snap = stream.depth
-            if snap and "b" in snap and "a" in snap and len(snap["b"]) > 0 and len(snap["a"]) > 0:
+            if snap["b"] is not None and len(snap["b"]) > 0 and len(snap["a"]) > 0:
                 # Update strategy with new depth data
                 strategy.update_depth(snap)
                 
@@ -167,8 +178,8 @@ async def monitor_tasks():
         await asyncio.sleep(5)
 
 if __name__ == '__main__':
-    # 이벤트 루프 생성 및 설정
-    loop = asyncio.new_event_loop()
+    # 이벤트 루프 생성 및 설정 (uvloop가 있으면 libuv 기반 루프 사용)
+    loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
 
     # 시그널 핸들러 등록
@@ -21,7 +21,7 @@ class BaseStrategy(ABC):
     
     @abstractmethod
     def get_indicator_data(self) -> dict:
-        """현재 지표 데이터 반환"""
+        """현재 지표 데이터 반환 (호출마다 새 dict를 반환하며, 호출자가 그대로 수정해도 됨)"""
         pass
     
     async def initialize_with_history(self):
@@ -38,6 +38,14 @@ class BaseStrategy(ABC):
         """
         pass
     
+    def update_trades_batch(self, prices: list[float], volumes: list[float]):
+        """
+        수신 큐에서 한 번에 꺼낸 거래 묶음으로 전략 업데이트 (선택적)
+        기본 구현은 update_trade를 거래마다 호출하며, 일괄 처리가 가능한 전략에서 재정의
+        """
+        for price, volume in zip(prices, volumes):
+            self.update_trade(price, volume)
+    
     def update_kline(self, high: float, low: float, close: float):
         """
         새로운 캔들 데이터로 전략 업데이트 (선택적)
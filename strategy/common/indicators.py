@@ -42,6 +42,35 @@ class VWAPCalculator:
         self.current_vwap = self._calculate_vwap()
         return self.current_vwap
     
+    def update_batch(self, prices: list[float], volumes: list[float]) -> list[float]:
+        """
+        Update VWAP with a batch of trades (window eviction and window sums computed once)
+        Returns the running VWAP after each valid trade, same as calling update() per trade
+        """
+        current_time = time.time()
+        trades = self.trades
+        
+        # Remove trades outside the window
+        cutoff_time = current_time - self.window_seconds
+        while trades and trades[0][0] < cutoff_time:
+            trades.popleft()
+        
+        # 윈도우 합계는 한 번만 구하고 거래마다 누적해 거래 시점의 VWAP 계산
+        total_pv = sum(trade[3] for trade in trades)
+        total_volume = sum(trade[2] for trade in trades)
+        vwaps = []
+        for price, volume in zip(prices, volumes):
+            if price > 0 and volume > 0:
+                pv = price * volume
+                trades.append((current_time, price, volume, pv))
+                total_pv += pv
+                total_volume += volume
+                vwaps.append(total_pv / total_volume)
+        
+        if vwaps:
+            self.current_vwap = vwaps[-1]
+        return vwaps
+    
     def _calculate_vwap(self) -> float:
         """Calculate VWAP from trades in the current window"""
         if not self.trades:
@@ -112,11 +141,11 @@ class ADXCalculator:
         self.lows.append(low)
         self.closes.append(close)
         
-        log.debug(f"[ADX] Added OHLC: H:{high:.2f}, L:{low:.2f}, C:{close:.2f}")
+        log.debug("[ADX] Added OHLC: H:%.2f, L:%.2f, C:%.2f", high, low, close)
         
         # Need at least 2 values to calculate TR and DM
         if len(self.closes) < 2:
-            log.debug(f"[ADX] Need at least 2 closes, have {len(self.closes)}")
+            log.debug("[ADX] Need at least 2 closes, have %d", len(self.closes))
             return None
             
         # Calculate True Range and Directional Movement for current period
@@ -150,7 +179,8 @@ class ADXCalculator:
                 self._plus_dm_ema = sum(self._init_plus_dm_values) / len(self._init_plus_dm_values)
                 self._minus_dm_ema = sum(self._init_minus_dm_values) / len(self._init_minus_dm_values)
                 
-                log.debug(f"[ADX] Initialized EMAs - ATR:{self._atr_ema:.4f}, +DM:{self._plus_dm_ema:.4f}, -DM:{self._minus_dm_ema:.4f}")
+                log.debug("[ADX] Initialized EMAs - ATR:%.4f, +DM:%.4f, -DM:%.4f",
+                          self._atr_ema, self._plus_dm_ema, self._minus_dm_ema)
         else:
             # Update EMAs with new values
             self._atr_ema = self.alpha * tr + (1 - self.alpha) * self._atr_ema
@@ -160,10 +190,10 @@ class ADXCalculator:
         # Calculate ADX if EMAs are initialized
         if self._atr_ema is not None:
             result = self._calculate_adx()
-            log.debug(f"[ADX] Calculated ADX: {result}")
+            log.debug("[ADX] Calculated ADX: %s", result)
             return result
         else:
-            log.debug(f"[ADX] Initializing EMAs: {len(self._init_tr_values)}/{self.period}")
+            log.debug("[ADX] Initializing EMAs: %d/%d", len(self._init_tr_values), self.period)
         
         return None
     
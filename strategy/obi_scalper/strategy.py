@@ -1,13 +1,15 @@
+import numpy as np
 from typing import Optional
 from strategy.common.base_strategy import BaseStrategy
 from config.settings import settings
 
 
 def calc_obi(depth_snap: dict, level: int):
-    bids = depth_snap["b"][:level]
-    asks = depth_snap["a"][:level]
-    bid_val = sum(float(p)*float(q) for p, q in bids)
-    ask_val = sum(float(p)*float(q) for p, q in asks)
+    """호가 [price, qty] 배열(또는 문자열 리스트)에서 상위 level개의 명목가치 기준 OBI 계산"""
+    bids = np.asarray(depth_snap["b"][:level], dtype=np.float64).reshape(-1, 2)
+    asks = np.asarray(depth_snap["a"][:level], dtype=np.float64).reshape(-1, 2)
+    bid_val = float(np.dot(bids[:, 0], bids[:, 1]))
+    ask_val = float(np.dot(asks[:, 0], asks[:, 1]))
     return bid_val / (bid_val + ask_val)
 
 
@@ -20,16 +22,20 @@ class OBIScalperStrategy(BaseStrategy):
     
     def __init__(self):
         self.current_depth = None
+        # 매 틱마다 settings를 조회하지 않도록 파라미터를 한 번만 읽어둠
+        self.depth_level = settings.DEPTH_LEVEL
+        self.obi_long = settings.OBI_LONG
+        self.obi_short = settings.OBI_SHORT
     
     def signal(self) -> Optional[str]:
         """거래 신호 생성"""
         if not self.is_ready():
             return None
             
-        obi = calc_obi(self.current_depth, settings.DEPTH_LEVEL)
-        if obi >= settings.OBI_LONG:
+        obi = calc_obi(self.current_depth, self.depth_level)
+        if obi >= self.obi_long:
             return "LONG"
-        elif obi <= settings.OBI_SHORT:
+        elif obi <= self.obi_short:
             return "SHORT"
         return None
     
@@ -42,11 +48,11 @@ class OBIScalperStrategy(BaseStrategy):
         if not self.current_depth:
             return {"obi": None}
         
-        obi = calc_obi(self.current_depth, settings.DEPTH_LEVEL)
+        obi = calc_obi(self.current_depth, self.depth_level)
         return {
             "obi": obi,
-            "obi_long_threshold": settings.OBI_LONG,
-            "obi_short_threshold": settings.OBI_SHORT
+            "obi_long_threshold": self.obi_long,
+            "obi_short_threshold": self.obi_short
         }
     
     def update_depth(self, depth_snap: dict):
@@ -1,10 +1,21 @@
 from config.settings import settings
 from utils.logger import log
+from dataclasses import dataclass
 from typing import Optional
 from ..common.base_strategy import BaseStrategy
 from ..common.indicators import VWAPCalculator, ADXCalculator, VWAPBandCalculator, VolatilityMonitor
 
 
+@dataclass(slots=True, frozen=True)
+class IndicatorSnapshot:
+    """GUI/스트림 갱신용 VWAP 지표 스냅샷 (dict 생성 없이 속성으로 접근)"""
+    vwap: float
+    upper_band: float
+    lower_band: float
+    adx: Optional[float]
+    is_halted: bool
+
+
 class VWAPMeanReversionStrategy(BaseStrategy):
     """
     VWAP Mean Reversion Trading Strategy
@@ -70,6 +81,34 @@ class VWAPMeanReversionStrategy(BaseStrategy):
         if self.warmup_trades >= self.min_warmup_trades:
             self.ready = True
     
+    def update_trades_batch(self, prices: list[float], volumes: list[float]):
+        """Update indicators with a burst of trades drained from the stream in one go"""
+        valid_prices = []
+        valid_volumes = []
+        for price, volume in zip(prices, volumes):
+            if price > 0 and volume > 0:
+                valid_prices.append(price)
+                valid_volumes.append(volume)
+        if not valid_prices:
+            return
+        
+        # VWAP 윈도우 합계는 묶음당 한 번만 계산하고, 밴드/변동성은 update_trade와 같이 거래마다 그 시점 VWAP으로 갱신
+        # (묶음 안에서 급등 후 되돌림이 있어도 변동성 중단이 동일하게 동작하도록)
+        vwaps = self.vwap_calc.update_batch(valid_prices, valid_volumes)
+        band_update = self.band_calc.update
+        volatility_update = self.volatility_monitor.update_price
+        for price, vwap in zip(valid_prices, vwaps):
+            if vwap > 0:
+                self.current_upper_band, self.current_lower_band = band_update(price, vwap)
+            volatility_update(price)
+        self.current_vwap = vwaps[-1]
+        self.current_price = valid_prices[-1]
+        
+        # Track warmup progress
+        self.warmup_trades += len(valid_prices)
+        if self.warmup_trades >= self.min_warmup_trades:
+            self.ready = True
+    
     def update_kline(self, high: float, low: float, close: float):
         """Update ADX with new kline data"""
         if high <= 0 or low <= 0 or close <= 0:
@@ -79,9 +118,10 @@ class VWAPMeanReversionStrategy(BaseStrategy):
         old_adx = self.current_adx
         self.current_adx = self.adx_calc.update(high, low, close)
         
-        log.debug(f"[VWAP Strategy] Kline update: H:{high:.2f}, L:{low:.2f}, C:{close:.2f}")
-        log.debug(f"[VWAP Strategy] ADX: {old_adx} -> {self.current_adx}")
-        log.debug(f"[VWAP Strategy] ADX calc has {len(self.adx_calc.tr_values)} TR values (need {self.adx_calc.period})")
+        log.debug("[VWAP Strategy] Kline update: H:%.2f, L:%.2f, C:%.2f", high, low, close)
+        log.debug("[VWAP Strategy] ADX: %s -> %s", old_adx, self.current_adx)
+        log.debug("[VWAP Strategy] ADX calc has %d TR values (need %d)",
+                  len(self.adx_calc._init_tr_values), self.adx_calc.period)
     
     def signal(self) -> Optional[str]:
         """Generate trading signal based on VWAP mean reversion logic"""
@@ -101,11 +141,11 @@ class VWAPMeanReversionStrategy(BaseStrategy):
             
         # Market regime filter
         if self.current_adx >= settings.ADX_STRONG_TREND_THRESHOLD:
-            log.debug(f"[VWAP Strategy] Strong trend detected (ADX={self.current_adx:.2f}), no trading")
+            log.debug("[VWAP Strategy] Strong trend detected (ADX=%.2f), no trading", self.current_adx)
             return None
             
         if self.current_adx >= settings.ADX_TREND_THRESHOLD:
-            log.debug(f"[VWAP Strategy] Developing trend (ADX={self.current_adx:.2f}), monitoring")
+            log.debug("[VWAP Strategy] Developing trend (ADX=%.2f), monitoring", self.current_adx)
             return None
         
         # Validate indicator values
@@ -115,7 +155,8 @@ class VWAPMeanReversionStrategy(BaseStrategy):
             self.current_upper_band > 0,
             self.current_lower_band > 0
         ]):
-            log.debug(f"[VWAP Strategy] Indicators not ready: price={self.current_price}, vwap={self.current_vwap}, bands=[{self.current_lower_band}-{self.current_upper_band}], adx={self.current_adx}")
+            log.debug("[VWAP Strategy] Indicators not ready: price=%s, vwap=%s, bands=[%s-%s], adx=%s",
+                      self.current_price, self.current_vwap, self.current_lower_band, self.current_upper_band, self.current_adx)
             return None
         
         # Mean reversion signal generation
@@ -156,6 +197,16 @@ class VWAPMeanReversionStrategy(BaseStrategy):
             'ready': self.ready
         }
     
+    def get_indicator_snapshot(self) -> IndicatorSnapshot:
+        """Get current indicator values as a slotted snapshot (hot-path alternative to get_indicator_data)"""
+        return IndicatorSnapshot(
+            vwap=self.current_vwap,
+            upper_band=self.current_upper_band,
+            lower_band=self.current_lower_band,
+            adx=self.current_adx,
+            is_halted=self.volatility_monitor.is_trading_halted()
+        )
+    
     def check_session_reset(self) -> bool:
         """Reset VWAP at configured hour (default: 00:00 UTC)"""
         from datetime import datetime
@@ -180,7 +231,7 @@ class VWAPMeanReversionStrategy(BaseStrategy):
     async def initialize_with_history(self):
         """봇 시작 시 히스토리 데이터로 ADX 초기화"""
         try:
-            from binance import AsyncClient
+            from utils.binance_client import OrjsonAsyncClient
             
             log.info("[VWAP Strategy] Initializing ADX with historical kline data...")
             
@@ -189,7 +240,7 @@ class VWAPMeanReversionStrategy(BaseStrategy):
                 "api_secret": settings.BINANCE_SECRET,
                 "testnet": settings.TESTNET,
             }
-            client = await AsyncClient.create(**kwargs)
+            client = await OrjsonAsyncClient.create(**kwargs)
             
             try:
                 # ADX 계산에 필요한 충분한 kline 데이터 가져오기 (30개)
@@ -211,7 +262,7 @@ class VWAPMeanReversionStrategy(BaseStrategy):
                     self.current_adx = adx_result
                     
                     if i % 10 == 0:  # 10개마다 로그
-                        log.debug(f"[VWAP Strategy] ADX init {i+1}/{len(klines)}: ADX={adx_result}")
+                        log.debug("[VWAP Strategy] ADX init %d/%d: ADX=%s", i + 1, len(klines), adx_result)
                 
                 log.info(f"[VWAP Strategy] ADX initialization completed. Final ADX: {self.current_adx}")
                 self._adx_initialized = True
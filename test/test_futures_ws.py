@@ -0,0 +1,56 @@
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add the project root to sys.path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.obi_settings import OBISettings
+from data import futures_ws
+from data.futures_ws import FuturesDepthStream
+
+
+# futures_depth_socket(combined stream 주소)이 실제로 전달하는 partial depth 메시지 형식
+DEPTH_PAYLOAD = {
+    "stream": "btcusdt@depth10",
+    "data": {
+        "e": "depthUpdate",
+        "E": 1700000000123,
+        "T": 1700000000120,
+        "s": "BTCUSDT",
+        "U": 390497796,
+        "u": 390497878,
+        "pu": 390497794,
+        "b": [["50000.10", "1.500"], ["50000.00", "0.250"], ["49999.90", "3.000"]],
+        "a": [["50000.20", "0.800"], ["50000.30", "2.000"], ["50000.40", "0.100"]],
+    },
+}
+
+
+class TestFuturesDepthStream:
+    """Test cases for FuturesDepthStream message handling"""
+
+    @pytest.fixture
+    def stream(self, monkeypatch):
+        """OBI settings with a 2-level book regardless of the STRATEGY_TYPE the suite was started with"""
+        monkeypatch.setattr(futures_ws, "settings", OBISettings(DEPTH_LEVEL=2))
+        return FuturesDepthStream("BTCUSDT")
+
+    def test_combined_stream_payload_updates_depth(self, stream):
+        """Top-N levels of the combined-stream payload become (N, 2) float arrays"""
+        stream._on_depth(DEPTH_PAYLOAD)
+
+        np.testing.assert_array_equal(stream.depth['b'], [[50000.10, 1.5], [50000.00, 0.25]])
+        np.testing.assert_array_equal(stream.depth['a'], [[50000.20, 0.8], [50000.30, 2.0]])
+        assert stream.depth['b'].dtype == np.float64
+        assert stream.stream_depth == 5
+
+    def test_message_without_data_is_ignored(self, stream):
+        """Socket error messages carry no book and leave the last depth untouched"""
+        stream._on_depth(DEPTH_PAYLOAD)
+        bids = stream.depth['b']
+
+        stream._on_depth({"e": "error", "type": "BinanceWebsocketClosed", "m": "Connection closed"})
+
+        assert stream.depth['b'] is bids
@@ -12,8 +12,10 @@ from executor.order_executor import (
     get_symbol_ticker, 
     get_open_orders,
     place_limit_maker,
+    place_limit_maker_batch,
     get_order,
-    place_market_order
+    place_market_order,
+    _qty
 )
 from config.settings import settings
 
@@ -25,7 +27,7 @@ class TestOrderExecutor:
         """Setup before each test"""
         # Reset client
         import executor.order_executor
-        executor.order_executor.client = None
+        executor.order_executor._client.set(None)
     
     @pytest.fixture
     def mock_client(self):
@@ -161,19 +163,113 @@ class TestOrderExecutor:
                     assert result["side"] == "BUY"
                     assert result["type"] == "LIMIT"
     
+    @pytest.mark.asyncio
+    async def test_place_limit_maker_batch_chunks_requests(self, mock_client):
+        """Test batch placement splits into requests of at most 5 orders"""
+        # Setup
+        inject_client(mock_client)
+        mock_client.futures_place_batch_order.side_effect = lambda batchOrders: [
+            {"orderId": i, "side": o["side"]} for i, o in enumerate(batchOrders)
+        ]
+        orders = [("BUY", 50000.0), ("SELL", 50010.5)] * 3
+        
+        # Execute
+        with patch.object(settings, 'DRY_RUN', False):
+            with patch.object(settings, 'SIZE_QUOTE', 100.0):
+                result = await place_limit_maker_batch(orders)
+        
+        # Assert
+        assert len(result) == 6
+        assert mock_client.futures_place_batch_order.call_count == 2
+        first_batch = mock_client.futures_place_batch_order.call_args_list[0].kwargs["batchOrders"]
+        assert len(first_batch) == 5
+        assert first_batch[1]["price"] == "50010.50"
+        assert first_batch[0]["quantity"] == "0.002000"
+        assert first_batch[0]["timeInForce"] == "GTX"
+        assert first_batch[0]["newOrderRespType"] == "ACK"
+        assert first_batch[0]["symbol"] == settings.SYMBOL
+    
+    @pytest.mark.asyncio
+    async def test_place_limit_maker_batch_partial_failure(self, mock_client):
+        """Test a failed batch request is expanded into per-order errors without losing other results"""
+        from binance.exceptions import BinanceAPIException
+        
+        # Setup
+        inject_client(mock_client)
+        error = BinanceAPIException(MagicMock(status_code=429), 429, '{"code": -1003, "msg": "Too many requests"}')
+        
+        async def place_batch(batchOrders):
+            if batchOrders[0]["price"] == "50100.00":
+                raise error
+            return [{"orderId": 100 + i, "side": o["side"]} for i, o in enumerate(batchOrders)]
+        
+        mock_client.futures_place_batch_order.side_effect = place_batch
+        orders = [("BUY", 50000.0)] * 5 + [("SELL", 50100.0)] * 5 + [("BUY", 50200.0)] * 2
+        
+        # Execute
+        with patch.object(settings, 'DRY_RUN', False):
+            result = await place_limit_maker_batch(orders)
+        
+        # Assert: 요청 순서대로 결과, 실패한 두 번째 묶음은 주문마다 오류 항목
+        assert len(result) == 12
+        assert [r.get("orderId") for r in result[:5]] == [100, 101, 102, 103, 104]
+        assert result[5:10] == [{"code": -1003, "msg": "Too many requests"}] * 5
+        assert [r.get("orderId") for r in result[10:]] == [100, 101]
+    
     @pytest.mark.asyncio
     async def test_client_not_injected_error(self):
         """Test error when client is not injected"""
         # Don't inject client
         with patch.object(settings, 'DRY_RUN', False):
-            with pytest.raises(AssertionError, match="AsyncClient"):
+            with pytest.raises(RuntimeError, match="AsyncClient"):
                 await get_symbol_ticker("BTCUSDT")
     
+    def test_qty_rounds_down_to_lot_size(self):
+        """Test quantity is truncated to 6 decimals"""
+        assert _qty(100.0, 50000.0) == "0.002000"
+        assert _qty(100.0, 30000.0) == "0.003333"
+        assert _qty(1000.0, 0.5) == "2000.000000"
+
+    def test_qty_matches_decimal_reference(self):
+        """Test integer rounding agrees with Decimal quantize(ROUND_DOWN)"""
+        from decimal import Decimal, ROUND_DOWN
+        for usdt in (5.0, 20.0, 100.0, 1000.0):
+            for price in (0.07, 1.23, 3.33, 97.5, 1234.56, 29999.99, 67123.45, 119999.01):
+                expected = format(
+                    Decimal(usdt / price).quantize(Decimal("0.000001"), rounding=ROUND_DOWN), "f"
+                )
+                assert _qty(usdt, price) == expected
+    
+    @pytest.mark.asyncio
+    async def test_load_symbol_filters_rounds_to_tick_and_step(self, mock_client):
+        """Test exchangeInfo tickSize/stepSize drive price and quantity formatting"""
+        import executor.order_executor as oe
+        inject_client(mock_client)
+        mock_client.futures_exchange_info.return_value = {
+            "symbols": [{
+                "symbol": "BTCUSDT",
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "tickSize": "0.10"},
+                    {"filterType": "LOT_SIZE", "stepSize": "0.001"},
+                ],
+            }]
+        }
+        default_filters = oe._filters
+        try:
+            await oe.load_symbol_filters("BTCUSDT")
+            assert oe._price(50000.16) == "50000.2"
+            assert _qty(1000.0, 30000.0) == "0.033"
+        finally:
+            oe._filters = default_filters
+            _qty.cache_clear()
+            oe._fmt_units.cache_clear()
+        assert _qty(1000.0, 30000.0) == "0.033333"
+    
     def test_inject_client(self, mock_client):
         """Test client injection"""
         inject_client(mock_client)
         import executor.order_executor
-        assert executor.order_executor.client == mock_client
+        assert executor.order_executor._require_client() is mock_client
 
 
 if __name__ == "__main__":
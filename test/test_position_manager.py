@@ -0,0 +1,168 @@
+import pytest
+import pytest_asyncio
+import asyncio
+import sqlite3
+from unittest.mock import AsyncMock, patch
+import sys
+import os
+
+# Add the project root to sys.path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from executor import order_executor
+from executor.position_manager import PositionManager
+from config.settings import settings
+
+
+def _order(order_id, side="BUY", qty="1"):
+    """place_limit_maker() 응답 형식의 주문"""
+    return {"orderId": order_id, "symbol": "BTCUSDT", "side": side, "origQty": qty, "price": "100"}
+
+
+def _rows(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+class TestPositionManager:
+    """Test cases for PositionManager order lifecycle and persistence"""
+
+    @pytest.fixture(autouse=True)
+    def isolated_cwd(self, tmp_path, monkeypatch):
+        """GUI 상태 파일 등 storage/ 상대 경로 쓰기가 저장소가 아닌 임시 디렉터리에 남도록 함"""
+        (tmp_path / "storage").mkdir()
+        monkeypatch.chdir(tmp_path)
+
+    @pytest_asyncio.fixture
+    async def manager(self, tmp_path, isolated_cwd):
+        """DRY_RUN PositionManager on a temporary DB (no user-data/price streams, REST order lookups stubbed)"""
+        settings.DRY_RUN = True
+        pm = PositionManager()
+        pm.db_path = str(tmp_path / "orders.db")
+        with patch.object(order_executor, "get_order", AsyncMock(return_value={"status": "NEW"})):
+            await pm.init()
+            yield pm
+            await pm.close()
+
+    @pytest.mark.asyncio
+    async def test_order_update_filled(self, manager):
+        """FILLED event moves the pending order to active positions"""
+        await manager.register_order(_order(1))
+        await manager._on_order_update({"X": "FILLED", "i": 1, "z": "1", "ap": "100.5", "p": "100"})
+
+        assert 1 not in manager._pending
+        position = manager._active[1]
+        assert position.entry_price == 100.5
+        assert position.quantity == 1.0
+        assert position.tp_price > position.entry_price > position.sl_price
+        assert _rows(manager.db_path, "SELECT order_id, quantity FROM active_positions") == [(1, 1.0)]
+        assert _rows(manager.db_path, "SELECT order_id FROM pending_orders") == []
+
+    @pytest.mark.asyncio
+    async def test_order_update_partial_fill_then_expired(self, manager):
+        """EXPIRED after a partial fill keeps the filled quantity as an active position"""
+        await manager.register_order(_order(2))
+        await manager._on_order_update({"X": "EXPIRED", "i": 2, "z": "0.4", "ap": "100.5", "p": "100"})
+
+        assert 2 not in manager._pending
+        assert manager._active[2].quantity == 0.4
+        assert _rows(manager.db_path, "SELECT order_id, quantity FROM active_positions") == [(2, 0.4)]
+
+    @pytest.mark.asyncio
+    async def test_order_update_canceled_without_fill(self, manager):
+        """CANCELED with nothing filled only drops the pending order"""
+        await manager.register_order(_order(3))
+        await manager._on_order_update({"X": "CANCELED", "i": 3, "z": "0", "ap": "0", "p": "100"})
+
+        assert 3 not in manager._pending
+        assert not manager._active
+        assert _rows(manager.db_path, "SELECT order_id FROM pending_orders") == []
+
+    @pytest.mark.asyncio
+    async def test_order_update_during_registration(self, manager):
+        """An event delivered while the pending INSERT is still queued is not lost"""
+        register = asyncio.create_task(manager.register_order(_order(4)))
+        await asyncio.sleep(0)  # register_order가 pending 인덱스에 등록하고 INSERT 커밋 대기 중
+        await manager._on_order_update({"X": "CANCELED", "i": 4, "z": "0", "ap": "0", "p": "100"})
+        await register
+
+        assert 4 not in manager._pending
+        assert _rows(manager.db_path, "SELECT order_id FROM pending_orders") == []
+
+    @pytest.mark.asyncio
+    async def test_reconcile_pending_orders(self, manager):
+        """REST reconcile applies the same FILLED / partial / CANCELED rules as the stream"""
+        for order_id in (10, 11, 12, 13):
+            await manager.register_order(_order(order_id))
+        responses = {
+            10: {"status": "FILLED", "avgPrice": "101", "price": "100", "executedQty": "1"},
+            11: {"status": "EXPIRED", "avgPrice": "100.2", "price": "100", "executedQty": "0.3"},
+            12: {"status": "CANCELED", "avgPrice": "0", "price": "100", "executedQty": "0"},
+            13: {"status": "NEW", "avgPrice": "0", "price": "100", "executedQty": "0"},
+        }
+
+        async def get_order(symbol, order_id):
+            return responses[order_id]
+
+        with patch.object(order_executor, "get_order", get_order):
+            await manager._reconcile_pending_orders()
+
+        assert list(manager._pending) == [13]
+        assert {order_id: p.quantity for order_id, p in manager._active.items()} == {10: 1.0, 11: 0.3}
+        assert _rows(manager.db_path, "SELECT order_id FROM pending_orders") == [(13,)]
+        assert sorted(_rows(manager.db_path, "SELECT order_id FROM active_positions")) == [(10,), (11,)]
+
+    @pytest.mark.asyncio
+    async def test_writer_rolls_back_only_failed_op(self, manager):
+        """A failing write in a batch is rolled back without losing the other writes of that commit"""
+        results = await asyncio.gather(
+            manager._write(
+                ("INSERT INTO pending_orders (order_id, symbol, side, orig_qty) VALUES (?, ?, ?, ?)",
+                 (20, "BTCUSDT", "BUY", 1.0)),
+                ("INSERT INTO missing_table VALUES (?)", (1,)),
+            ),
+            manager.register_order(_order(21)),
+            return_exceptions=True
+        )
+
+        assert isinstance(results[0], sqlite3.OperationalError)
+        assert results[1] is None
+        # 실패한 작업은 앞선 문장까지 함께 롤백
+        assert _rows(manager.db_path, "SELECT order_id FROM pending_orders") == [(21,)]
+
+    @pytest.mark.asyncio
+    async def test_migrate_tp_sl_columns(self, tmp_path):
+        """Old active_positions without tp_price/sl_price gets the columns and backfilled levels"""
+        db_path = str(tmp_path / "old.db")
+        conn = sqlite3.connect(db_path)
+        conn.executescript(
+            """
+            CREATE TABLE active_positions (
+                order_id INTEGER PRIMARY KEY,
+                symbol TEXT NOT NULL,
+                side TEXT NOT NULL,
+                entry_price REAL NOT NULL,
+                quantity REAL NOT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                strategy_type TEXT DEFAULT 'OBI',
+                vwap_at_entry REAL DEFAULT NULL
+            );
+            INSERT INTO active_positions (order_id, symbol, side, entry_price, quantity, strategy_type)
+            VALUES (30, 'BTCUSDT', 'SELL', 100.0, 1.0, 'OBI');
+            """
+        )
+        conn.close()
+
+        settings.DRY_RUN = True
+        pm = PositionManager()
+        pm.db_path = db_path
+        await pm.init()
+        await pm.close()
+
+        (tp_price, sl_price), = _rows(db_path, "SELECT tp_price, sl_price FROM active_positions")
+        assert tp_price == pytest.approx(100.0 * (1 - settings.TP_PCT))
+        assert sl_price == pytest.approx(100.0 * (1 + settings.SL_PCT))
+        assert pm._active[30].tp_price == pytest.approx(tp_price)
@@ -0,0 +1,96 @@
+import pytest
+import random
+from datetime import timedelta
+import sys
+import os
+
+# Add the project root to sys.path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.vwap_settings import VWAPSettings
+from strategy.vwap_mean_reversion import strategy as vwap_strategy
+from strategy.vwap_mean_reversion.strategy import VWAPMeanReversionStrategy
+
+
+class TestVWAPBatchUpdate:
+    """update_trades_batch must match calling update_trade for every trade"""
+
+    @pytest.fixture(autouse=True)
+    def vwap_settings(self, monkeypatch):
+        """Run the strategy with VWAP settings regardless of the STRATEGY_TYPE the suite was started with"""
+        monkeypatch.setattr(vwap_strategy, "settings", VWAPSettings())
+
+    def _trades(self, n=300, seed=7):
+        rng = random.Random(seed)
+        price = 50000.0
+        prices, volumes = [], []
+        for _ in range(n):
+            price *= 1 + rng.uniform(-0.0002, 0.0002)
+            prices.append(price)
+            volumes.append(rng.uniform(0.001, 2.0))
+        return prices, volumes
+
+    def _assert_same_state(self, batched, single):
+        assert batched.current_price == single.current_price
+        assert batched.current_vwap == pytest.approx(single.current_vwap, rel=1e-12)
+        assert batched.current_upper_band == pytest.approx(single.current_upper_band, rel=1e-12)
+        assert batched.current_lower_band == pytest.approx(single.current_lower_band, rel=1e-12)
+        assert list(batched.band_calc.price_deviations) == pytest.approx(
+            list(single.band_calc.price_deviations), rel=1e-9, abs=1e-15
+        )
+        assert batched.warmup_trades == single.warmup_trades
+        assert batched.ready == single.ready
+        assert batched.volatility_monitor.is_trading_halted() == single.volatility_monitor.is_trading_halted()
+
+    def test_batch_matches_per_trade(self):
+        """Bands, VWAP and warmup agree trade-for-trade across bursts of different sizes"""
+        prices, volumes = self._trades()
+        batched = VWAPMeanReversionStrategy()
+        single = VWAPMeanReversionStrategy()
+
+        i = 0
+        for size in (1, 7, 50, 3, 120, 119):
+            batched.update_trades_batch(prices[i:i + size], volumes[i:i + size])
+            for price, volume in zip(prices[i:i + size], volumes[i:i + size]):
+                single.update_trade(price, volume)
+            i += size
+            self._assert_same_state(batched, single)
+
+    def test_batch_halts_on_intra_burst_spike(self):
+        """A spike and reversal inside one burst still triggers the volatility halt"""
+        prices, volumes = self._trades(n=20)
+        batched = VWAPMeanReversionStrategy()
+        single = VWAPMeanReversionStrategy()
+        batched.update_trades_batch(prices, volumes)
+        for price, volume in zip(prices, volumes):
+            single.update_trade(price, volume)
+
+        # 기존 가격들을 10초 전 체결로 만들어 5초 변동성 기준 가격이 존재하도록 함
+        for strategy in (batched, single):
+            buffer = strategy.volatility_monitor.price_buffer
+            aged = [(price, ts - timedelta(seconds=10)) for price, ts in buffer]
+            buffer.clear()
+            buffer.extend(aged)
+
+        # 1% 급등 후 같은 묶음 안에서 원래 가격으로 되돌림
+        burst_prices = [prices[-1] * 1.01, prices[-1]]
+        burst_volumes = [1.0, 1.0]
+        batched.update_trades_batch(burst_prices, burst_volumes)
+        for price, volume in zip(burst_prices, burst_volumes):
+            single.update_trade(price, volume)
+
+        assert single.volatility_monitor.is_trading_halted()
+        self._assert_same_state(batched, single)
+
+    def test_batch_skips_invalid_trades(self):
+        """Non-positive prices/volumes are ignored like update_trade does"""
+        batched = VWAPMeanReversionStrategy()
+        single = VWAPMeanReversionStrategy()
+        prices = [100.0, 0.0, 101.0, 102.0]
+        volumes = [1.0, 1.0, -1.0, 2.0]
+        batched.update_trades_batch(prices, volumes)
+        for price, volume in zip(prices, volumes):
+            single.update_trade(price, volume)
+
+        self._assert_same_state(batched, single)
+        assert batched.warmup_trades == 2
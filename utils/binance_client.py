@@ -0,0 +1,32 @@
+from binance import AsyncClient
+from binance.exceptions import BinanceAPIException, BinanceRequestException
+
+try:
+    import orjson
+except ImportError:
+    # orjson이 없으면 python-binance 기본(aiohttp + 표준 json) 디코딩 사용
+    orjson = None
+
+
+class OrjsonAsyncClient(AsyncClient):
+    """
+    REST 응답 본문을 orjson으로 디코딩하는 AsyncClient
+    (기본 구현은 response.text()로 한 번 읽은 뒤 response.json()에서 표준 json으로 다시 파싱)
+    WebSocket 메시지는 python-binance가 orjson 설치 시 이미 orjson으로 디코딩함
+    """
+
+    async def _handle_response(self, response):
+        if orjson is None:
+            return await super()._handle_response(response)
+
+        if not str(response.status).startswith("2"):
+            raise BinanceAPIException(response, response.status, await response.text())
+
+        body = await response.read()
+        if not body:
+            return {}
+
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            raise BinanceRequestException(f"Invalid Response: {body.decode(errors='replace')}")
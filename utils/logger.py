@@ -1,6 +1,9 @@
+import atexit
 import logging
 import os
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 # ── 로그 디렉터리(logs/) 자동 생성 ──────────────────────────
@@ -9,13 +12,27 @@ LOG_DIR.mkdir(parents=True, exist_ok=True)
 log_path = LOG_DIR / f"bot_{datetime.utcnow():%Y%m%d}.log"
 
 # ── 기본 로깅 설정 ───────────────────────────────────────────
+# 포맷팅과 파일/터미널 출력은 QueueListener 스레드에서 처리 → 이벤트 루프는 큐에 넣기만 함
+_formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+_handlers = [
+    logging.FileHandler(log_path, encoding="utf-8"),
+    logging.StreamHandler()                     # 터미널에도 동시에 출력
+]
+for _handler in _handlers:
+    _handler.setFormatter(_formatter)
+
+_log_queue = queue.SimpleQueue()
+_queue_handler = QueueHandler(_log_queue)
+# QueueHandler는 메시지 인자만 합쳐서 넘기고 나머지 포맷은 리스너 핸들러가 담당
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
+_listener = QueueListener(_log_queue, *_handlers, respect_handler_level=True)
+_listener.start()
+atexit.register(_listener.stop)                 # 종료 시 남은 로그 flush
+
 logging.basicConfig(
     level=logging.INFO,                         # 필요시 DEBUG 로 변경
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[
-        logging.FileHandler(log_path, encoding="utf-8"),
-        logging.StreamHandler()                 # 터미널에도 동시에 출력
-    ],
+    handlers=[_queue_handler],
 )
 
 # ── 편하게 쓰기 위한 단일 로거 객체 ────────────────────────